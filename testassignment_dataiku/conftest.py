@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from framework.utils import requests_utils
+from framework.utils.requests_utils import AvailableAPIActions, RequestsHelpers
+from framework.utils.timing import LatencyRecorder
+from framework.utils.todo_server import TodoServer
+
+
+UI_TESTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "suites", "ui_tests")
+
+stand_in_server = None
+worker_latencies = None  # merged recordings of the pytest-xdist workers, kept by the controller
+
+
+def pytest_addoption(parser):
+    parser.addoption("--stand-in", action="store_true", default=False,
+                     help="run the api suites against an in-process todo server instead of BASEURL, "
+                          "with pytest-xdist (-n) every worker gets its own server; the ui suites are skipped")
+    parser.addoption("--namespaced-backend", action="store_true", default=False,
+                     help="BASEURL keeps a separate db per X-Todo-Namespace header (e.g. a shared stand-in server), "
+                          "required to run pytest-xdist (-n) workers against it")
+    parser.addoption("--latency", action="store_true", default=False,
+                     help="record per-endpoint request latencies and print their percentiles at the end of the session")
+    parser.addoption("--latency-json", default=None,
+                     help="export the per-endpoint latency percentiles to this json file, implies --latency")
+    parser.addoption("--response-cache", type=float, default=None, metavar="TTL",
+                     help="answer repeated reads from a cache kept for TTL seconds and dropped on every mutation")
+
+
+def pytest_configure(config):
+    global stand_in_server, worker_latencies
+    worker_id = getattr(config, "workerinput", {}).get("workerid")
+    if worker_id is not None:
+        # keeps workers sharing one stand-in server (TODO_BASEURL) isolated from each other
+        requests_utils.set_namespace(worker_id)
+
+    distributing = worker_id is None and getattr(config.option, "numprocesses", None)
+    if distributing and not (config.getoption("--stand-in") or config.getoption("--namespaced-backend") or
+                             only_ui_tests(config)):
+        # every api worker resets the db in setUp, on a backend ignoring the namespace they'd wipe each other's data
+        raise pytest.UsageError("-n needs --stand-in or a backend isolating namespaces (--namespaced-backend), "
+                                "only suites/ui_tests runs in parallel against other backends")
+    if config.getoption("--stand-in") and not distributing:
+        stand_in_server = TodoServer().start()
+        requests_utils.set_base_url(stand_in_server.url)
+        RequestsHelpers.configure_pool(trust_env=False)  # no proxy lookups on every loopback request
+
+    if config.getoption("--latency") or config.getoption("--latency-json"):
+        # under -n the requests run in the workers, which send their recordings back when they finish
+        if distributing:
+            worker_latencies = LatencyRecorder(requests_utils.BASEURL)
+        else:
+            RequestsHelpers.enable_timing()
+
+    if config.getoption("--response-cache") is not None:
+        AvailableAPIActions.enable_response_cache(ttl=config.getoption("--response-cache"))
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption("--stand-in"):
+        return
+    # the stand-in only serves the api, there is no web app for the browser to load
+    skip_ui = pytest.mark.skip(reason="the stand-in server doesn't serve the web app")
+    for item in items:
+        if os.path.commonpath([str(item.fspath), UI_TESTS_DIR]) == UI_TESTS_DIR:
+            item.add_marker(skip_ui)
+
+
+def only_ui_tests(config):
+    # ui workers never reset the db, each of them works with its own user instead (db_fixtures.WorkerUser)
+    paths = [os.path.abspath(str(arg).split("::")[0]) for arg in config.args]
+    return bool(paths) and all(os.path.commonpath([path, UI_TESTS_DIR]) == UI_TESTS_DIR for path in paths)
+
+
+def pytest_sessionfinish(session):
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None and RequestsHelpers.latency_recorder is not None:
+        workeroutput["latencies"] = RequestsHelpers.latency_recorder.dump()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    latencies = getattr(node, "workeroutput", {}).get("latencies")
+    if worker_latencies is not None and latencies is not None:
+        worker_latencies.merge(latencies)
+
+
+def latency_recorder():
+    return worker_latencies if worker_latencies is not None else RequestsHelpers.latency_recorder
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    cache = AvailableAPIActions.response_cache
+    if cache is not None:
+        terminalreporter.write_sep("=", "response cache")
+        terminalreporter.write_line(
+            "{hits} hits, {misses} misses ({hit_rate:.1%}), {evictions} evictions, {invalidations} invalidations"
+            .format(**cache.statistics()))
+
+    recorder = latency_recorder()
+    if recorder is None or not recorder.histograms:
+        return
+    terminalreporter.write_sep("=", "request latencies")
+    terminalreporter.write_line(recorder.format_summary())
+
+
+def pytest_unconfigure(config):
+    global stand_in_server, worker_latencies
+    AvailableAPIActions.disable_response_cache()
+    recorder = latency_recorder()
+    RequestsHelpers.disable_timing()
+    worker_latencies = None
+    json_path = config.getoption("--latency-json")
+    # workers leave the export to the controller, which has all of their recordings
+    if recorder is not None and json_path and not hasattr(config, "workerinput"):
+        recorder.export_json(json_path)
+
+    if stand_in_server is not None:
+        stand_in_server.stop()
+        stand_in_server = None
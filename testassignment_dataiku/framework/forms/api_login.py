@@ -0,0 +1,77 @@
+import os
+
+from selenium.common.exceptions import WebDriverException
+
+from framework.forms.todopage import SIGN_OUT_BUTTON
+from framework.utils import seeding
+from framework.utils.requests_utils import AvailableAPIActions
+
+
+LOGIN_CHECK_TIMEOUT = 1  # seconds for the sign out button to show up after an injected login
+# cookie/storage keys the web app keeps its session under, comma separated; when unset the token login is
+# skipped and the login form is used
+TOKEN_KEYS = tuple(key for key in os.environ.get("TODO_UI_TOKEN_KEYS", "").split(",") if key)
+USERNAME_KEYS = tuple(key for key in os.environ.get("TODO_UI_USERNAME_KEYS", "").split(",") if key)
+WRITE_STORAGE_SCRIPT = """
+var state = arguments[0];
+Object.keys(state.local).forEach(function (key) { window.localStorage.setItem(key, state.local[key]); });
+Object.keys(state.session).forEach(function (key) { window.sessionStorage.setItem(key, state.session[key]); });
+"""
+
+
+class ApiLogin:
+    # starts ui tests logged in without typing credentials: the api token is stored under the configured
+    # TOKEN_KEYS, and the login form is only used when there are none or the app doesn't show the user as logged in
+    @classmethod
+    def login(cls, webpage, username, password):
+        if TOKEN_KEYS:
+            rsp = AvailableAPIActions.authenticate(AvailableAPIActions.create_params_for_auth(username, password),
+                                                   verify=False)
+            token = rsp.json().get("token") if rsp.status_code == 200 else None
+            if token and cls.apply(webpage, cls.token_cookies(username, token), cls.token_storage(username, token)):
+                return "token"
+
+        webpage.login(username, password)
+        assert webpage.driver.get_visible_element(SIGN_OUT_BUTTON) is not None, \
+            "Couldn't login as {} through the login form".format(username)
+        return "ui"
+
+    @classmethod
+    def apply(cls, webpage, cookies, storage):
+        driver = webpage.driver
+        try:
+            for cookie in cookies:
+                driver.add_cookie({key: value for key, value in cookie.items()
+                                   if key in ("name", "value", "path", "secure", "httpOnly", "expiry")})
+            driver.execute_script(WRITE_STORAGE_SCRIPT, storage)
+        except WebDriverException:
+            return False
+        driver.refresh()
+        if driver.get_visible_element(SIGN_OUT_BUTTON, LOGIN_CHECK_TIMEOUT) is not None:
+            return True
+        cls.clear(webpage)
+        return False
+
+    @staticmethod
+    def clear(webpage):
+        webpage.driver.delete_all_cookies()
+        webpage.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        webpage.driver.refresh()
+
+    @staticmethod
+    def token_cookies(username, token):
+        return [{"name": key, "value": token, "path": "/"} for key in TOKEN_KEYS] + \
+               [{"name": key, "value": username, "path": "/"} for key in USERNAME_KEYS]
+
+    @staticmethod
+    def token_storage(username, token):
+        items = dict({key: token for key in TOKEN_KEYS}, **{key: username for key in USERNAME_KEYS})
+        return {"local": items, "session": {}}
+
+    @staticmethod
+    def seed(webpage, specs):
+        # tasks are created through the api and the page reloaded to show them
+        result = seeding.seed_tasks(specs)
+        assert not result.failures, "Couldn't create tasks: {}".format(result.failures)
+        webpage.driver.refresh()
+        return result
@@ -1,38 +1,138 @@
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from urllib.parse import urljoin
+
+from framework.utils import requests_utils
+
+
+WEB_PATH = "web/index.html"
+# every task row of the table with the fields get_task_info reads, in one round trip; null until the table is shown
+TASK_TABLE_SCRIPT = """
+var table = document.querySelector("table.table.table-striped");
+function visible(elem) {
+    return !!(elem && (elem.offsetWidth || elem.offsetHeight || elem.getClientRects().length));
+}
+if (!visible(table)) {
+    return null;
+}
+function texts(row, selector) {
+    return Array.prototype.filter.call(row.querySelectorAll(selector), visible).map(function (elem) {
+        return elem.innerText.trim();
+    });
+}
+var tasks = [];
+Array.prototype.forEach.call(table.querySelectorAll("tr"), function (row) {
+    var title = texts(row, "b[data-bind*='text: title']");
+    if (!title.length) {
+        return;
+    }
+    tasks.push({title: title[0], username: texts(row, "b[data-bind*='text: username']")[0],
+                tags: texts(row, "span[data-bind*='text: tag.name']"),
+                date: texts(row, "span[data-bind*='text: date']")[0],
+                done: texts(row, "span[class*='label label-']").length > 0});
+});
+return tasks;
+"""
+
+
+# sets the value of every (element, value) pair and fires the events knockout's value binding listens to
+FILL_SCRIPT = """
+arguments[0].forEach(function (pair) {
+    var elem = pair[0];
+    elem.value = pair[1];
+    ["input", "change"].forEach(function (type) {
+        elem.dispatchEvent(new Event(type, {bubbles: true}));
+    });
+});
+"""
+SIGN_OUT_BUTTON = (By.XPATH, "//button[contains(@data-bind, 'click: logout')]")
+OWNER_ROW = "//tr[.//b[contains(@data-bind, 'text: username')][normalize-space()='{}']]"
+
+
+def web_url():
+    # the web app is served by the api server, so it follows TODO_BASEURL (the stand-in serves no web app,
+    # conftest skips the ui suites under --stand-in)
+    return urljoin(requests_utils.BASEURL, WEB_PATH)
 
 
 class Common:
-    def __init__(self, driver):
+    def __init__(self, driver, scraping=False, fast_fill=False):
         self.driver = driver
-        self.url = "http://iankusheva.qatest.dataiku.com/web/index.html"
+        # read tasks with TASK_TABLE_SCRIPT instead of one lookup per field; opt-in, the script reads the table
+        # as soon as it is shown and doesn't wait for a field to change after e.g. a click
+        self.scraping = scraping
+        self.fast_fill = fast_fill  # set form values with FILL_SCRIPT instead of typing them
+        self.elements = {}
+        self.elements_navigation = None
+        self.owner = None
+        self.row_xpath = ""
+        self.url = web_url()
         self.driver.get(self.url)
 
+    def visible_element(self, locator):
+        # single elements are memoized until the next page load; a cached element is checked with one
+        # is_displayed call instead of a new lookup, and looked up again once hidden or detached from the dom
+        if self.elements_navigation != self.driver.navigation:
+            self.elements = {}
+            self.elements_navigation = self.driver.navigation
+        element = self.elements.get(locator)
+        if element is not None:
+            try:
+                if element.is_displayed():
+                    return element
+            except StaleElementReferenceException:
+                pass
+        element = self.driver.get_visible_element(locator)
+        if element is None:
+            self.elements.pop(locator, None)
+        else:
+            self.elements[locator] = element
+        return element
+
+    def scope_to_user(self, username):
+        # task fields, row buttons and scraped tasks are then only looked for in the rows of that user's tasks,
+        # so tests running in parallel with other users never read or click the rows of another test
+        assert "'" not in username, "Can't scope rows to a username containing quotes: {}".format(username)
+        self.owner = username
+        self.row_xpath = OWNER_ROW.format(username)
+
+    def in_row(self, xpath):
+        return By.XPATH, self.row_xpath + xpath
+
+    def owned(self, tasks):
+        if tasks is None or self.owner is None:
+            return tasks
+        return [task for task in tasks if task.get("username") == self.owner]
+
+    def fill(self, pairs):
+        self.driver.execute_script(FILL_SCRIPT, [[element, value] for element, value in pairs])
+
 
 class MainPage(Common):
     @property
     def delete_task_button(self):
-        return self.driver.get_visible_elem_by_xpath("//button[contains(@data-bind, 'click: $parent.remove')]")
+        return self.visible_element(self.in_row("//button[contains(@data-bind, 'click: $parent.remove')]"))
 
     @property
     def mark_in_progress_button(self):
-        return self.driver.get_visible_elem_by_xpath("//button[contains(@data-bind, 'click: $parent.markInProgress')]")
+        return self.visible_element(self.in_row("//button[contains(@data-bind, 'click: $parent.markInProgress')]"))
 
     @property
     def mark_done_button(self):
-        return self.driver.get_visible_elem_by_xpath("//button[contains(@data-bind, 'click: $parent.markDone')]")
+        return self.visible_element(self.in_row("//button[contains(@data-bind, 'click: $parent.markDone')]"))
 
     @property
     def task_text_field(self):
-        return self.driver.get_visible_elem_by_xpath("//b[contains(@data-bind, 'text: title')]").text
+        return self.visible_element(self.in_row("//b[contains(@data-bind, 'text: title')]")).text
 
     @property
     def owner_text_field(self):
-        return self.driver.get_visible_elem_by_xpath("//b[contains(@data-bind, 'text: username')]").text
+        return self.visible_element(self.in_row("//b[contains(@data-bind, 'text: username')]")).text
 
     @property
     def tags_text_elements(self):
-        return self.driver.get_visible_elems_by_xpath("//span[contains(@data-bind, 'text: tag.name')]")
+        return self.driver.get_visible_elements(self.in_row("//span[contains(@data-bind, 'text: tag.name')]"))
 
     @property
     def tasks_table_rows(self):
@@ -40,6 +140,11 @@ class MainPage(Common):
         rows = table.find_elements(By.TAG_NAME, "tr")  # get all of the rows in the table
         return rows
 
+    @property
+    def tasks_table(self):
+        # the fields of every task on the page, header and other rows without a task are left out
+        return self.owned(self.driver.get_script_result(TASK_TABLE_SCRIPT))
+
     @property
     def tags_text_field(self):
         tags_elems = self.tags_text_elements
@@ -48,15 +153,15 @@ class MainPage(Common):
 
     @property
     def date_text_field(self):
-        return self.driver.get_visible_elem_by_xpath("//span[contains(@data-bind, 'text: date')]").text
+        return self.visible_element(self.in_row("//span[contains(@data-bind, 'text: date')]")).text
 
     @property
     def done_status(self):
-        return True if self.driver.get_visible_elem_by_xpath("//span[contains(@class, 'label label-')]") else False
+        return True if self.visible_element(self.in_row("//span[contains(@class, 'label label-')]")) else False
 
     @property
     def sign_out_button(self):
-        return self.driver.get_visible_elem_by_xpath("//button[contains(@data-bind, 'click: logout')]")
+        return self.visible_element(SIGN_OUT_BUTTON)
 
     def delete_task(self):
         self.delete_task_button.click()
@@ -70,20 +175,27 @@ class MainPage(Common):
     def logout(self):
         self.sign_out_button.click()
 
-    def get_task_info(self):
+    def get_task_info(self, accept=None):
+        # accept e.g. lambda tasks: tasks[0]["done"] is True makes scraping wait for the expected state
+        if self.scraping:
+            tasks = self.owned(self.driver.get_script_result(
+                TASK_TABLE_SCRIPT, accept=lambda tasks: bool(self.owned(tasks)) and (
+                    accept is None or accept(self.owned(tasks)))))
+            return tasks[0] if tasks else None
         return {"title": self.task_text_field, "username": self.owner_text_field, "tags": self.tags_text_field,
                 "date": self.date_text_field, "done": self.done_status}
 
 
 class Login(Common):
+    login_requests = 0
 
     @property
     def username_field(self):
-        return self.driver.get_visible_elem_by_name("username")
+        return self.visible_element((By.NAME, "username"))
 
     @property
     def password_field(self):
-        return self.driver.get_visible_elem_by_name("password")
+        return self.visible_element((By.NAME, "password"))
 
     def login(self, username, password):
         self.username_field.clear()
@@ -91,29 +203,39 @@ class Login(Common):
 
         self.password_field.clear()
         self.password_field.send_keys(password)
+        self.login_requests = self.driver.track_requests()
         self.password_field.send_keys(Keys.RETURN)
 
+    def is_logged_out(self):
+        # decided as soon as the login requests are answered, after the full timeout when none was sent
+        self.driver.wait_for_requests(self.login_requests)
+        return self.driver.is_absent(SIGN_OUT_BUTTON)
+
 
 class AddTask(Common):
 
     @property
     def title_field(self):
-        return self.driver.get_visible_elem_by_xpath("//input[contains(@data-bind, 'value: title')]")
+        return self.visible_element((By.XPATH, "//input[contains(@data-bind, 'value: title')]"))
 
     @property
     def tags_field(self):
-        return self.driver.get_visible_elem_by_xpath("//input[contains(@data-bind, 'value: tags')]")
+        return self.visible_element((By.XPATH, "//input[contains(@data-bind, 'value: tags')]"))
 
     @property
     def add_task_confirm_button(self):
-        return self.driver.get_visible_elem_by_xpath("//button[contains(@data-bind, 'click:addTask')]")
+        return self.visible_element((By.XPATH, "//button[contains(@data-bind, 'click:addTask')]"))
 
     @property
     def add_task_button(self):
-        return self.driver.get_visible_elem_by_id("btn-add")
+        return self.visible_element((By.ID, "btn-add"))
 
-    def add_task(self, title, tags):
+    def add_task(self, title, tags, fast_fill=None):
         self.add_task_button.click()
+        if self.fast_fill if fast_fill is None else fast_fill:
+            self.fill([(self.title_field, title), (self.tags_field, tags)])
+            self.add_task_confirm_button.click()
+            return
         self.title_field.clear()
         self.tags_field.clear()
         self.title_field.send_keys(title)
@@ -125,7 +247,7 @@ class EditTask(Common):
 
     @property
     def task_text_field_edit(self):
-        return self.driver.get_visible_elem_by_xpath("//input[contains(@data-bind, 'value: title')]")
+        return self.visible_element((By.XPATH, "//input[contains(@data-bind, 'value: title')]"))
 
     @property
     def tags_text_elements_edit(self):
@@ -133,18 +255,39 @@ class EditTask(Common):
 
     @property
     def mark_done_checkbox(self):
-        return self.driver.get_visible_elem_by_xpath("//input[contains(@data-bind, 'checked: done')]")
+        return self.visible_element((By.XPATH, "//input[contains(@data-bind, 'checked: done')]"))
 
     @property
     def edit_task_confirm_button(self):
-        return self.driver.get_visible_elem_by_xpath("//button[contains(@data-bind, 'click:editTask')]")
+        return self.visible_element((By.XPATH, "//button[contains(@data-bind, 'click:editTask')]"))
 
     @property
     def edit_task_button(self):
-        return self.driver.get_visible_elem_by_xpath("//button[contains(@data-bind, 'click: $parent.beginEdit')]")
+        return self.visible_element(self.in_row("//button[contains(@data-bind, 'click: $parent.beginEdit')]"))
 
-    def edit_task(self, title=None, tags=None, done=None):
+    def edit_task(self, title=None, tags=None, done=None, fast_fill=None):
         self.edit_task_button.click()
+        if self.fast_fill if fast_fill is None else fast_fill:
+            self.fill_task_edit(title, tags)
+        else:
+            self.type_task_edit(title, tags)
+        if done is not None:
+            self.mark_done_checkbox.click()
+        self.edit_task_confirm_button.click()
+
+    def fill_task_edit(self, title, tags):
+        pairs = []
+        if title:
+            pairs.append((self.task_text_field_edit, title))
+        if tags:
+            existing_tags = self.tags_text_elements_edit
+            if len(tags) < len(existing_tags):
+                values = list(tags) + [""] * (len(existing_tags) - len(tags))
+                pairs.extend(zip(existing_tags, values))
+        if pairs:
+            self.fill(pairs)
+
+    def type_task_edit(self, title, tags):
         if title:
             self.task_text_field_edit.click()
             self.task_text_field_edit.clear()
@@ -156,12 +299,9 @@ class EditTask(Common):
                     elem.clear()
                 for elem, text in zip(existing_tags, tags):
                     elem.send_keys(text)
-        if done is not None:
-            self.mark_done_checkbox.click()
-        self.edit_task_confirm_button.click()
 
 
 class TodoPage(MainPage, AddTask, EditTask, Login):
 
-    def __init__(self, driver):
-        super(TodoPage, self).__init__(driver)
+    def __init__(self, driver, scraping=False, fast_fill=False):
+        super(TodoPage, self).__init__(driver, scraping, fast_fill)
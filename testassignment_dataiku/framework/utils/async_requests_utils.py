@@ -0,0 +1,145 @@
+import asyncio
+import base64
+from urllib.parse import urljoin
+
+import aiohttp
+
+from framework.utils import json_codec, requests_utils
+from framework.utils.requests_utils import AvailableAPIActions, JSON_HEADERS, TAGS, USERS, AUTH, RESET
+
+
+class AsyncResponse:
+    # the body is read while the connection is held, so the response can be used after it went back to the pool
+    def __init__(self, status_code, content, headers, url):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json_codec.loads(self.content)
+
+
+class AsyncRequestsHelpers:
+    def __init__(self, max_concurrency=100, limit=100, limit_per_host=0, keepalive_timeout=15):
+        self.max_concurrency = max_concurrency
+        self.connector_settings = {"limit": limit, "limit_per_host": limit_per_host,
+                                   "keepalive_timeout": keepalive_timeout}
+        self._semaphore = None
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            # like the sync pool, no cookie set by one call is sent with the next ones
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(**self.connector_settings),
+                                                  headers=requests_utils.namespace_headers(),
+                                                  cookie_jar=aiohttp.DummyCookieJar())
+        return self._session
+
+    @property
+    def semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, method, url, verify, **kwargs):
+        try:
+            async with self.semaphore:
+                async with self.session.request(method, url, **kwargs) as rsp:
+                    content = await rsp.read()
+                    rsp = AsyncResponse(rsp.status, content, rsp.headers, str(rsp.url))
+            if verify:
+                assert rsp.status_code == 200, "Unsuccessful {} request, got response code {}".format(
+                    method.lower(), rsp.status_code)
+            return rsp
+        except Exception:
+            raise
+
+    async def post_request(self, url, data, verify=True):
+        return await self.request("POST", url, verify, data=None if data is None else json_codec.dumps(data),
+                                  headers=JSON_HEADERS if data is not None else None)
+
+    async def get_request(self, url, params=None):
+        return await self.request("GET", url, True, params=params)
+
+    async def put_request(self, url, data, verify, headers=None):
+        return await self.request("PUT", url, verify, data=data, headers=headers)
+
+    async def delete_request(self, url, verify, headers=None):
+        return await self.request("DELETE", url, verify, headers=headers)
+
+    async def patch_request(self, url, data, verify, headers=None):
+        return await self.request("PATCH", url, verify, data=data, headers=headers)
+
+
+class AsyncAPIActions:
+    create_auth_headers = staticmethod(AvailableAPIActions.create_auth_headers)
+    create_params_for_auth = staticmethod(AvailableAPIActions.create_params_for_auth)
+    create_params_for_task_creation = staticmethod(AvailableAPIActions.create_params_for_task_creation)
+    create_params_for_task_modification = staticmethod(AvailableAPIActions.create_params_for_task_modification)
+
+    def __init__(self, max_concurrency=100, **connector_settings):
+        self.helpers = AsyncRequestsHelpers(max_concurrency, **connector_settings)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.helpers.close()
+
+    @staticmethod
+    def create_basic_auth_headers(username, password):
+        credentials = "{}:{}".format(username, password).encode("latin-1")
+        return {"Authorization": "Basic {}".format(base64.b64encode(credentials).decode())}
+
+    async def get_list_of_tasks(self):
+        return await self.helpers.get_request(requests_utils.BASEURL)
+
+    async def get_list_of_tags(self):
+        return await self.helpers.get_request(urljoin(requests_utils.BASEURL, TAGS))
+
+    async def create_task(self, params, username, password, verify=True, needs_auth=True):
+        headers = self.create_basic_auth_headers(username, password) if needs_auth else None
+        return await self.helpers.put_request(requests_utils.BASEURL, json_codec.dumps(params), verify, headers=headers)
+
+    async def create_task_with_token(self, params, headers, verify=True):
+        return await self.helpers.put_request(requests_utils.BASEURL, json_codec.dumps(params), verify=verify,
+                                              headers=headers)
+
+    async def get_task_description(self, task_id):
+        return await self.helpers.get_request(urljoin(requests_utils.BASEURL, str(task_id)))
+
+    async def delete_task(self, task_id, username, password, verify=True, needs_auth=True):
+        headers = self.create_basic_auth_headers(username, password) if needs_auth else None
+        return await self.helpers.delete_request(urljoin(requests_utils.BASEURL, str(task_id)), verify,
+                                                 headers=headers)
+
+    async def modify_task(self, task_id, data, username, password, verify=True, needs_auth=True):
+        headers = self.create_basic_auth_headers(username, password) if needs_auth else None
+        return await self.helpers.patch_request(urljoin(requests_utils.BASEURL, str(task_id)), json_codec.dumps(data),
+                                                verify, headers=headers)
+
+    async def get_information_about_tag(self, tag_id):
+        return await self.helpers.get_request(urljoin(requests_utils.BASEURL, "{}/{}".format(TAGS, tag_id)))
+
+    async def create_new_user(self, data, verify=True):
+        return await self.helpers.post_request(urljoin(requests_utils.BASEURL, USERS), data, verify)
+
+    async def authenticate(self, data, verify=True):
+        return await self.helpers.post_request(urljoin(requests_utils.BASEURL, AUTH), data, verify)
+
+    async def reset_db(self):
+        await self.helpers.get_request(urljoin(requests_utils.BASEURL, RESET))
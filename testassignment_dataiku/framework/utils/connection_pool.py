@@ -0,0 +1,129 @@
+import http.cookiejar
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+
+DEFAULT_POOL_SETTINGS = {
+    "pool_connections": 10,  # number of per-host pools kept alive
+    "pool_maxsize": 10,  # connections kept per host
+    "pool_block": False,  # block instead of opening extra connections once a host is at pool_maxsize
+    "keep_alive": True,
+    "max_retries": 3,  # retries on connection errors only, requests that reached the server are never replayed
+    "backoff_factor": 0.1,
+    "trust_env": True,  # proxies and netrc from the environment, looked up on every request
+    "compression": True,  # ask for every content encoding urllib3 can decode here (zstd once zstandard is installed)
+}
+
+
+class ConnectionPool:
+    def __init__(self, **settings):
+        self._lock = threading.Lock()
+        self._session = None
+        self.headers = {}
+        self.response_hooks = []
+        self.settings = dict(DEFAULT_POOL_SETTINGS)
+        self._update_settings(settings)
+
+    @property
+    def session(self):
+        session = self._session
+        if session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+                session = self._session
+        return session
+
+    def configure(self, **settings):
+        with self._lock:
+            self._update_settings(settings)
+            old_session, self._session = self._session, None
+        if old_session is not None:
+            old_session.close()
+
+    def set_header(self, name, value):
+        with self._lock:
+            for headers in (self.headers, self._session.headers if self._session is not None else {}):
+                if value is None:
+                    headers.pop(name, None)
+                else:
+                    headers[name] = value
+
+    def add_response_hook(self, hook):
+        with self._lock:
+            self.response_hooks.append(hook)
+            if self._session is not None:
+                self._session.hooks["response"].append(hook)
+
+    def remove_response_hook(self, hook):
+        with self._lock:
+            for hooks in (self.response_hooks, self._session.hooks["response"] if self._session is not None else []):
+                if hook in hooks:
+                    hooks.remove(hook)
+
+    def close(self):
+        with self._lock:
+            old_session, self._session = self._session, None
+        if old_session is not None:
+            old_session.close()
+
+    def statistics(self):
+        hosts = {}
+        session = self._session
+        if session is not None:
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    host = "{}://{}:{}".format(pool.scheme, pool.host, pool.port)
+                    host_stats = hosts.setdefault(host, {"requests": 0, "new_connections": 0})
+                    host_stats["requests"] += pool.num_requests
+                    host_stats["new_connections"] += pool.num_connections
+
+        for host_stats in hosts.values():
+            self._add_reuse_stats(host_stats)
+
+        total = {"requests": sum(s["requests"] for s in hosts.values()),
+                 "new_connections": sum(s["new_connections"] for s in hosts.values())}
+        self._add_reuse_stats(total)
+        total["hosts"] = hosts
+        return total
+
+    @staticmethod
+    def _add_reuse_stats(stats):
+        # a request served over an already open connection is a pool hit, opening a new one is a miss
+        stats["hits"] = max(stats["requests"] - stats["new_connections"], 0)
+        stats["misses"] = stats["new_connections"]
+        stats["reuse_ratio"] = stats["hits"] / stats["requests"] if stats["requests"] else 0.0
+
+    def _update_settings(self, settings):
+        unknown = set(settings) - set(DEFAULT_POOL_SETTINGS)
+        assert not unknown, "Unknown connection pool settings: {}".format(", ".join(sorted(unknown)))
+        self.settings.update(settings)
+
+    def _create_session(self):
+        retries = Retry(total=self.settings["max_retries"], connect=self.settings["max_retries"], read=False,
+                        status=0, other=0, redirect=False, backoff_factor=self.settings["backoff_factor"],
+                        allowed_methods=None, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.settings["pool_connections"],
+                              pool_maxsize=self.settings["pool_maxsize"],
+                              pool_block=self.settings["pool_block"],
+                              max_retries=retries)
+        session = requests.Session()
+        # the session is shared by the whole run, a cookie set by one call must not authenticate the next ones
+        session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        session.trust_env = self.settings["trust_env"]
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.settings["keep_alive"]:
+            session.headers["Connection"] = "close"
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING if self.settings["compression"] else "identity"
+        session.headers.update(self.headers)
+        session.hooks["response"].extend(self.response_hooks)
+        return session
@@ -0,0 +1,56 @@
+import base64
+import threading
+import time
+from collections import namedtuple
+
+
+CachedToken = namedtuple("CachedToken", ["password", "token", "expires_at"])
+
+
+def encode_token(token):
+    token = "{}:".format(token)  # username:password
+    return base64.b64encode(token.encode()).decode()
+
+
+class TokenCache:
+    def __init__(self, authenticate, refresh_margin=30):
+        self.authenticate = authenticate  # callable(username, password) returning the authenticate response
+        self.refresh_margin = refresh_margin  # seconds before the server side expiration a token is renewed
+        self.lock = threading.Lock()
+        self.user_locks = {}
+        self.tokens = {}
+
+    def get_token(self, username, password):
+        cached = self.tokens.get(username)
+        if self._is_valid(cached, password):
+            return cached.token
+
+        # one authentication per user even when many threads need a fresh token at once
+        with self._user_lock(username):
+            cached = self.tokens.get(username)
+            if self._is_valid(cached, password):
+                return cached.token
+            requested_at = time.monotonic()
+            rsp = self.authenticate(username, password)
+            if rsp.status_code != 200:
+                self.tokens.pop(username, None)
+                return None
+            token_info = rsp.json()
+            self.tokens[username] = CachedToken(password, token_info.get("token"),
+                                                requested_at + float(token_info.get("expires")))
+            return token_info.get("token")
+
+    def invalidate(self, username=None):
+        with self.lock:
+            if username is None:
+                self.tokens.clear()
+            else:
+                self.tokens.pop(username, None)
+
+    def _is_valid(self, cached, password):
+        return cached is not None and cached.password == password and \
+            time.monotonic() < cached.expires_at - self.refresh_margin
+
+    def _user_lock(self, username):
+        with self.lock:
+            return self.user_locks.setdefault(username, threading.Lock())
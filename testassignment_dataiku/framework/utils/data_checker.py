@@ -1,5 +1,11 @@
 import datetime
 
+import numpy as np
+
+
+MAX_FIELD_LENGTH = 20
+MAX_TASK_AGE = 60  # seconds
+
 
 def check_task_details(task, title, tags, username, done=False):
     task_date = task.get("date")
@@ -19,10 +25,142 @@ def check_task_details(task, title, tags, username, done=False):
 
     task_date_datetime = datetime.datetime.strptime(task_date, '%Y-%m-%dT%H:%M:%S.%fZ')
     date_now = datetime.datetime.now()
-    assert (date_now - task_date_datetime).total_seconds() < 60, "Created task has incorrect date"
+    assert (date_now - task_date_datetime).total_seconds() < MAX_TASK_AGE, "Created task has incorrect date"
 
 
 def check_tag_details(tag_details, tag, titles):
     assert tag_details.get("tag") == tag, "Got incorrect tag name in tag details"
     assert sorted(tag_details.get("tasks")) == sorted(titles), "Incorrect task titles linked to the tag"
 
+
+class BatchReport:
+    def __init__(self, checked):
+        self.checked = checked
+        self.violations = {}  # check name -> ids of the violating tasks
+
+    @property
+    def ok(self):
+        return not self.violations
+
+    def add(self, check, ids):
+        if len(ids):
+            self.violations.setdefault(check, []).extend(np.asarray(ids).tolist())
+
+    def __str__(self):
+        if self.ok:
+            return "All {} tasks are valid".format(self.checked)
+        lines = ["{} of {} tasks violate checks".format(len(set().union(*self.violations.values())), self.checked)]
+        for check, ids in sorted(self.violations.items()):
+            shown = ", ".join(str(task_id) for task_id in ids[:10])
+            lines.append("  {}: {} tasks ({}{})".format(check, len(ids), shown, ", ..." if len(ids) > 10 else ""))
+        return "\n".join(lines)
+
+
+def tag_names(tags):
+    if tags and isinstance(tags[0], dict):
+        return [tag.get("name") for tag in tags]
+    return tags
+
+
+def check_tasks_batch(tasks, expected=None, usernames=None, max_age=None, now=None):
+    # validates a whole dump at once: one pass builds the columns, every invariant is then a vectorized pass,
+    # expected maps titles to dicts with the expected "tags", "username" and "done"
+    ids, titles, owners, done, dates, tags = [], [], [], [], [], []
+    for task in tasks:
+        ids.append(task.get("id"))
+        titles.append(task.get("title"))
+        owners.append(task.get("username"))
+        done.append(task.get("done"))
+        dates.append(task.get("date"))
+        tags.append(task.get("tags"))
+
+    report = BatchReport(len(ids))
+    if not ids:
+        return report
+    ids = np.array(ids, dtype=object)
+    titles = np.array([title if isinstance(title, str) else "" for title in titles])
+    owners = np.array([owner if isinstance(owner, str) else "" for owner in owners])
+
+    unique_ids, id_counts = np.unique(ids.astype(str), return_counts=True)
+    report.add("duplicate_id", ids[np.isin(ids.astype(str), unique_ids[id_counts > 1])])
+
+    title_lengths = np.char.str_len(titles)
+    report.add("invalid_title", ids[(title_lengths == 0) | (title_lengths > MAX_FIELD_LENGTH)])
+    unique_titles, title_counts = np.unique(titles, return_counts=True)
+    report.add("duplicate_title", ids[np.isin(titles, unique_titles[title_counts > 1]) & (title_lengths > 0)])
+
+    if usernames is not None:
+        report.add("unknown_owner", ids[~np.isin(owners, list(usernames))])
+    else:
+        report.add("unknown_owner", ids[np.char.str_len(owners) == 0])
+
+    done_flags = np.array([value if isinstance(value, bool) else None for value in done], dtype=object)
+    report.add("invalid_done", ids[np.equal(done_flags, None)])
+    done_flags = done_flags.astype(bool)
+
+    dates = check_dates(report, ids, dates, max_age, now)
+    check_tags(report, ids, tags)
+
+    if expected is not None:
+        known = np.array([title in expected for title in titles])
+        report.add("unexpected_task", ids[~known])
+        specs = [expected.get(title, {}) for title in titles]
+        expected_owners = np.array([spec.get("username", owner) for spec, owner in zip(specs, owners)])
+        report.add("incorrect_owner", ids[known & (expected_owners != owners)])
+        expected_done = np.array([bool(spec.get("done", False)) for spec in specs])
+        report.add("incorrect_done", ids[known & (expected_done != done_flags)])
+        expected_tags = [frozenset(spec.get("tags") or []) for spec in specs]
+        task_tags = [frozenset(tag_names(task_tags) or []) if isinstance(task_tags, list) else None
+                     for task_tags in tags]
+        report.add("incorrect_tags", ids[known & np.not_equal(np.array(expected_tags, dtype=object),
+                                                              np.array(task_tags, dtype=object))])
+        missing = set(expected) - set(titles.tolist())
+        if missing:  # there are no ids for tasks that were never saved, their titles are reported instead
+            report.violations["missing_task"] = sorted(missing)
+    return report
+
+
+def check_dates(report, ids, dates, max_age, now):
+    # dates are "%Y-%m-%dT%H:%M:%S.%fZ", numpy parses the ISO part without the trailing Z
+    dates = np.array([date if isinstance(date, str) else "" for date in dates])
+    well_formed = np.char.endswith(dates, "Z") & (np.char.str_len(dates) > 1)
+    iso_dates = np.where(well_formed, np.char.rstrip(dates, "Z"), "NaT")
+    try:
+        parsed = iso_dates.astype("datetime64[us]")
+    except ValueError:
+        parsed = np.array([parse_iso_date(date) for date in iso_dates], dtype="datetime64[us]")
+    invalid = np.isnat(parsed)
+    report.add("invalid_date", ids[invalid])
+
+    now = np.datetime64(now or datetime.datetime.now(), "us")
+    age = (now - parsed) / np.timedelta64(1, "s")
+    report.add("date_in_future", ids[~invalid & (age < -MAX_TASK_AGE)])
+    if max_age is not None:
+        report.add("date_too_old", ids[~invalid & (age > max_age)])
+    return parsed
+
+
+def parse_iso_date(date):
+    try:
+        return np.datetime64(date, "us")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+def check_tags(report, ids, tags):
+    is_list = np.array([isinstance(task_tags, list) for task_tags in tags])
+    report.add("invalid_tags", ids[~is_list])
+    names = [tag_names(task_tags) if isinstance(task_tags, list) else [] for task_tags in tags]
+    lengths = np.array([len(task_names) for task_names in names])
+    flat_names = np.array([name if isinstance(name, str) else "" for task_names in names for name in task_names])
+    if not len(flat_names):
+        return
+    owners = np.repeat(np.arange(len(names)), lengths)
+    name_lengths = np.char.str_len(flat_names)
+    bad_names = (name_lengths == 0) | (name_lengths > MAX_FIELD_LENGTH)
+    report.add("invalid_tag", ids[np.unique(owners[bad_names])])
+    # a (task, name) pair seen twice is a duplicated tag of that task
+    pairs = np.char.add(np.char.add(owners.astype(str), "\x00"), flat_names)
+    unique_pairs, pair_counts = np.unique(pairs, return_counts=True)
+    duplicated = np.isin(pairs, unique_pairs[pair_counts > 1])
+    report.add("duplicate_tags", ids[np.unique(owners[duplicated])])
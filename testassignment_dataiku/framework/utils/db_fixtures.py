@@ -0,0 +1,80 @@
+import os
+import uuid
+
+from framework.utils.requests_utils import AvailableAPIActions
+
+
+DEFAULT_USERNAME = "QA"
+DEFAULT_PASSWORD = "willWin"
+
+
+def qa_user_with_tagged_task():
+    params = AvailableAPIActions.create_params_for_task_creation("test_title", ["test_tag"])
+    AvailableAPIActions.create_task(params, DEFAULT_USERNAME, DEFAULT_PASSWORD)
+
+
+class DbSnapshots:
+    # named db states built once and restored in one request on servers supporting snapshots (the stand-in),
+    # rebuilt from scratch with reset_db on servers that don't
+    builders = {"qa_user_with_tagged_task": qa_user_with_tagged_task}
+    captured = set()
+    supported = None
+
+    @classmethod
+    def register(cls, name, builder):
+        cls.builders[name] = builder
+        cls.captured.discard(name)
+
+    @classmethod
+    def restore(cls, name):
+        assert name in cls.builders, "Unknown db snapshot '{}'".format(name)
+        if name in cls.captured:
+            rsp = AvailableAPIActions.restore_snapshot(name, verify=False)
+            if rsp.status_code == 200:
+                return
+            cls.captured.discard(name)  # the server was restarted or reset its snapshots
+
+        AvailableAPIActions.reset_db()
+        cls.builders[name]()
+        cls.capture(name)
+
+    @classmethod
+    def capture(cls, name):
+        if cls.supported is False:
+            return
+        rsp = AvailableAPIActions.capture_snapshot(name, verify=False)
+        cls.supported = rsp.status_code == 200
+        if cls.supported:
+            cls.captured.add(name)
+
+    @classmethod
+    def forget(cls):
+        cls.captured.clear()
+        cls.supported = None
+
+
+class WorkerUser:
+    # a dedicated user per pytest-xdist worker: parallel tests can't reset the shared db, so they only ever
+    # create, read and clean up the tasks of their own user
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.username = "ui_{}_{}".format(worker_id, uuid.uuid4().hex[:6])
+        self.password = uuid.uuid4().hex  # the deployed service rejects a password another user already has
+        self.created = False
+
+    @classmethod
+    def for_worker(cls):
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+        return cls(worker_id) if worker_id else None
+
+    def provision(self):
+        if not self.created:
+            AvailableAPIActions.create_new_user(AvailableAPIActions.create_params_for_auth(self.username,
+                                                                                         self.password))
+            self.created = True
+        return self.username, self.password
+
+    def clear_tasks(self):
+        for task in list(AvailableAPIActions.iter_tasks()):
+            if task.get("username") == self.username:
+                AvailableAPIActions.delete_task(task.get("id"), self.username, self.password)
@@ -0,0 +1,69 @@
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+from requests import Response
+
+
+def _stdlib_dumps(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _stdlib_loads(content):
+    return json.loads(content)
+
+
+def _ujson_dumps(data):
+    return ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+
+CODECS = {"json": (_stdlib_dumps, _stdlib_loads)}
+if ujson is not None:
+    CODECS["ujson"] = (_ujson_dumps, ujson.loads)
+if orjson is not None:
+    CODECS["orjson"] = (orjson.dumps, orjson.loads)
+PREFERENCE = ("orjson", "ujson", "json")
+
+name = None
+dumps = None  # data -> utf-8 encoded bytes
+loads = None  # bytes or str -> data, invalid json raises ValueError whatever the codec
+
+
+def select_codec(codec=None):
+    # the fastest installed library unless one is asked for, TODO_JSON_CODEC=json forces the stdlib back
+    global name, dumps, loads
+    codec = codec or os.environ.get("TODO_JSON_CODEC")
+    if codec is None:
+        codec = next(candidate for candidate in PREFERENCE if candidate in CODECS)
+    assert codec in CODECS, "JSON codec '{}' is not installed, available: {}".format(codec, ", ".join(sorted(CODECS)))
+    name = codec
+    dumps, loads = CODECS[codec]
+    return name
+
+
+def response_json(rsp, **json_kwargs):
+    # requests guesses the body encoding before decoding it with the stdlib, the codecs read utf-8 bytes directly
+    if json_kwargs or name == "json":
+        return Response.json(rsp, **json_kwargs)
+    try:
+        return loads(rsp.content)
+    except ValueError:
+        # invalid bodies are decoded again by requests, so callers get the exception requests raises
+        return Response.json(rsp)
+
+
+def response_hook(rsp, *args, **kwargs):
+    rsp.json = lambda **json_kwargs: response_json(rsp, **json_kwargs)
+    return rsp
+
+
+select_codec()
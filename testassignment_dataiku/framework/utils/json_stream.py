@@ -0,0 +1,101 @@
+import codecs
+import json
+
+
+WHITESPACE = " \t\n\r"
+NUMBER_CONTINUATION = ".eE+-0123456789"
+
+
+class JsonStreamParser:
+    # incrementally parses the top level json array or object of a chunked body, one element at a time
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        self.exhausted = False
+
+    def iter_array(self):
+        self._expect("[")
+        if self._peek() == "]":
+            return
+        while True:
+            yield self._value()
+            if self._separator("]"):
+                return
+
+    def iter_object(self):
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            yield key, self._value()
+            if self._separator("}"):
+                return
+
+    def _separator(self, closing):
+        char = self._peek()
+        self.position += 1
+        if char == closing:
+            return True
+        if char != ",":
+            raise ValueError("Expected ',' or '{}' at position {}, got {!r}".format(closing, self.position, char))
+        return False
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError("Expected {!r} in json stream, got {!r}".format(char, self._peek()))
+        self.position += 1
+
+    def _peek(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read():
+                return ""
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # a value running to the end of the buffer may be cut, e.g. a number, unless the stream is over;
+                # so may a number followed by a char that could continue it, "[1." decodes as 1 with ".5]" to come
+                if self.exhausted or (end < len(self.buffer) and not self._may_continue(value, end)):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+            self._read()
+
+    def _may_continue(self, value, end):
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and \
+            self.buffer[end] in NUMBER_CONTINUATION
+
+    def _read(self):
+        if self.exhausted:
+            return False
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        for chunk in self.chunks:
+            text = self.text_decoder.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self.text_decoder.decode(b"", final=True)
+        self.exhausted = True
+        return True
+
+
+def iter_json_array(chunks):
+    return JsonStreamParser(chunks).iter_array()
+
+
+def iter_json_object(chunks):
+    return JsonStreamParser(chunks).iter_object()
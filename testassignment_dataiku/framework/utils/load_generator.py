@@ -0,0 +1,262 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+
+from framework.utils import requests_utils, logging_helpers
+from framework.utils.requests_utils import AvailableAPIActions, RequestsHelpers
+
+
+log = logging_helpers.set_log()
+
+DEFAULT_WEIGHTS = {"create_task": 3, "modify_task": 2, "delete_task": 1, "list_tasks": 4, "list_tags": 2,
+                   "tag_details": 2, "authenticate": 1}
+
+
+class LoadProfile:
+    def __init__(self, duration=60, ramp_up=0, ramp_down=0, target_rps=None, concurrency=10, weights=None,
+                 username="QA", password="willWin"):
+        assert duration > 0, "Load duration must be positive"
+        assert ramp_up + ramp_down <= duration, "Ramp-up and ramp-down must fit in the load duration"
+        assert concurrency > 0, "Concurrency must be positive"
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.ramp_down = ramp_down
+        self.target_rps = target_rps  # None drives the workers back to back, a fixed concurrency load
+        self.concurrency = concurrency
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        unknown = set(self.weights) - set(LoadOperations.names)
+        assert not unknown, "Unknown load operations: {}".format(", ".join(sorted(unknown)))
+        self.username = username
+        self.password = password
+
+    def level(self, elapsed):
+        # share of the target load applied at a point of the run: linear ramps around a steady phase
+        if elapsed < self.ramp_up:
+            return elapsed / self.ramp_up
+        if elapsed > self.duration - self.ramp_down:
+            return max(self.duration - elapsed, 0) / self.ramp_down
+        return 1.0
+
+    def expected_requests(self, elapsed):
+        # requests due since the start of the run at target_rps, the integral of the load level
+        elapsed = min(elapsed, self.duration)
+        ramp_up = min(elapsed, self.ramp_up)
+        total = ramp_up * ramp_up / (2 * self.ramp_up) if self.ramp_up else 0.0
+        steady_end = self.duration - self.ramp_down
+        total += max(min(elapsed, steady_end) - self.ramp_up, 0)
+        if elapsed > steady_end:
+            ramp_down = elapsed - steady_end
+            total += ramp_down - ramp_down * ramp_down / (2 * self.ramp_down)
+        return total * self.target_rps
+
+
+class LoadOperations:
+    names = ("create_task", "modify_task", "delete_task", "list_tasks", "list_tags", "tag_details", "authenticate")
+
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+        self.lock = threading.Lock()
+        self.task_ids = []
+        self.tag_ids = []
+
+    def run(self, name):
+        return getattr(self, name)()
+
+    def create_task(self):
+        title = "load_{}".format(uuid.uuid4().hex[:15])
+        tag = "tag_{}".format(random.randrange(100))
+        params = AvailableAPIActions.create_params_for_task_creation(title, [tag])
+        rsp = AvailableAPIActions.create_task(params, self.username, self.password, verify=False)
+        if rsp.status_code == 200:
+            task = rsp.json()
+            with self.lock:
+                self.task_ids.append(task.get("id"))
+                self.tag_ids.extend(tag.get("url").split("/")[-1] for tag in task.get("tags", []))
+        return rsp
+
+    def modify_task(self):
+        task_id = self._pick(self.task_ids)
+        if task_id is None:
+            return self.create_task()
+        params = AvailableAPIActions.create_params_for_task_modification(done=random.choice([True, False]))
+        return AvailableAPIActions.modify_task(task_id, params, self.username, self.password, verify=False)
+
+    def delete_task(self):
+        with self.lock:
+            task_id = self.task_ids.pop(random.randrange(len(self.task_ids))) if self.task_ids else None
+        if task_id is None:
+            return self.create_task()
+        return AvailableAPIActions.delete_task(task_id, self.username, self.password, verify=False)
+
+    def list_tasks(self):
+        return AvailableAPIActions.get_list_of_tasks(verify=False)
+
+    def list_tags(self):
+        return AvailableAPIActions.get_list_of_tags(verify=False)
+
+    def tag_details(self):
+        tag_id = self._pick(self.tag_ids)
+        if tag_id is None:
+            return self.list_tags()
+        return AvailableAPIActions.get_information_about_tag(tag_id, verify=False)
+
+    def authenticate(self):
+        return AvailableAPIActions.authenticate(
+            AvailableAPIActions.create_params_for_auth(self.username, self.password), verify=False)
+
+    def _pick(self, values):
+        with self.lock:
+            return random.choice(values) if values else None
+
+
+class LoadReport:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.operations = {}
+
+    def record(self, elapsed, operation, latency, error):
+        second = int(elapsed)
+        with self.lock:
+            bucket = self.buckets.setdefault(second, {"requests": 0, "errors": 0, "latency": 0.0})
+            bucket["requests"] += 1
+            bucket["errors"] += int(error)
+            bucket["latency"] += latency
+            op_stats = self.operations.setdefault(operation, {"requests": 0, "errors": 0})
+            op_stats["requests"] += 1
+            op_stats["errors"] += int(error)
+
+    @property
+    def timeline(self):
+        timeline = []
+        with self.lock:
+            for second in range(max(self.buckets) + 1 if self.buckets else 0):
+                bucket = self.buckets.get(second, {"requests": 0, "errors": 0, "latency": 0.0})
+                requests = bucket["requests"]
+                timeline.append({"second": second, "throughput": requests, "errors": bucket["errors"],
+                                 "error_rate": bucket["errors"] / requests if requests else 0.0,
+                                 "mean_latency": bucket["latency"] / requests if requests else 0.0})
+        return timeline
+
+    def summary(self, duration):
+        with self.lock:
+            requests = sum(bucket["requests"] for bucket in self.buckets.values())
+            errors = sum(bucket["errors"] for bucket in self.buckets.values())
+            operations = {name: dict(stats) for name, stats in self.operations.items()}
+        return {"duration": duration, "requests": requests, "errors": errors,
+                "throughput": requests / duration if duration else 0.0,
+                "error_rate": errors / requests if requests else 0.0, "operations": operations}
+
+    def to_json(self, duration):
+        return {"summary": self.summary(duration), "timeline": self.timeline}
+
+
+class LoadGenerator:
+    def __init__(self, profile):
+        self.profile = profile
+        self.operations = LoadOperations(profile.username, profile.password)
+        self.report = LoadReport()
+        self.names = list(profile.weights)
+        self.weights = [profile.weights[name] for name in self.names]
+        self._pacer_lock = threading.Lock()
+        self._issued = 0
+        self._start = None
+
+    def run(self):
+        RequestsHelpers.ensure_pool_size(self.profile.concurrency)
+        self._start = time.monotonic()
+        self._issued = 0
+        workers = [threading.Thread(target=self._worker, args=(index,), name="load-worker-{}".format(index),
+                                    daemon=True) for index in range(self.profile.concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return self.report
+
+    def _worker(self, index):
+        while True:
+            elapsed = time.monotonic() - self._start
+            if elapsed >= self.profile.duration:
+                return
+            if not self._wait_for_slot(index, elapsed):
+                continue
+
+            operation = random.choices(self.names, self.weights)[0]
+            started = time.monotonic()
+            try:
+                error = self.operations.run(operation).status_code != 200
+            except Exception:
+                error = True
+            self.report.record(started - self._start, operation, time.monotonic() - started, error)
+
+    def _wait_for_slot(self, index, elapsed):
+        level = self.profile.level(elapsed)
+        if self.profile.target_rps is None:
+            # fixed concurrency: only the first workers proportional to the current load level are active
+            if index >= max(round(level * self.profile.concurrency), 1):
+                time.sleep(0.05)
+                return False
+            return True
+
+        with self._pacer_lock:
+            # a burst after a stall is bounded to one second worth of requests
+            allowed = self.profile.expected_requests(elapsed)
+            self._issued = max(self._issued, allowed - self.profile.target_rps)
+            if self._issued + 1 <= allowed:
+                self._issued += 1
+                return True
+        rate = self.profile.target_rps * level
+        time.sleep(min(1.0 / rate, 0.05) if rate > 0 else 0.05)
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply sustained load to the todo service")
+    parser.add_argument("--base-url", help="target server, BASEURL by default")
+    parser.add_argument("--stand-in", action="store_true", help="load an in-process stand-in server")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--ramp-up", type=float, default=0)
+    parser.add_argument("--ramp-down", type=float, default=0)
+    parser.add_argument("--rps", type=float, help="target requests per second, fixed concurrency if omitted")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--weights", type=json.loads, help='operation weights as json, e.g. {"list_tasks": 5}')
+    parser.add_argument("--token-auth", action="store_true",
+                        help="authenticate mutating requests with cached tokens instead of credentials")
+    parser.add_argument("--output", help="write the summary and the timeline as json to this file")
+    args = parser.parse_args()
+
+    server = None
+    if args.stand_in:
+        from framework.utils.todo_server import TodoServer
+        server = TodoServer().start()
+        requests_utils.set_base_url(server.url)
+    elif args.base_url:
+        requests_utils.set_base_url(args.base_url)
+
+    if args.token_auth:
+        AvailableAPIActions.enable_token_auth()
+
+    try:
+        profile = LoadProfile(args.duration, args.ramp_up, args.ramp_down, args.rps, args.concurrency, args.weights)
+        report = LoadGenerator(profile).run()
+    finally:
+        if server is not None:
+            server.stop()
+
+    for point in report.timeline:
+        log.info("{second:>4}s {throughput:>6} req/s {error_rate:>7.2%} errors {mean_latency:.4f}s mean latency"
+                 .format(**point))
+    summary = report.summary(args.duration)
+    log.info("Total: {requests} requests, {throughput:.1f} req/s, {error_rate:.2%} errors".format(**summary))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report.to_json(args.duration), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,94 @@
-import requests
-import json
+import os
 from requests.auth import HTTPBasicAuth
 from urllib.parse import urljoin
 
+from framework.utils import json_codec
+from framework.utils.connection_pool import ConnectionPool
+from framework.utils.credentials import TokenCache
+from framework.utils.json_stream import iter_json_array, iter_json_object
+from framework.utils.response_cache import ResponseCache, ValidatorCache
+from framework.utils.timing import LatencyRecorder
 
-BASEURL = "http://iankusheva.qatest.dataiku.com/"
+
+BASEURL = os.environ.get("TODO_BASEURL", "http://iankusheva.qatest.dataiku.com/")
 TAGS = "tags"
 USERS = "users"
 AUTH = "authenticate"
 RESET = "reset"
+SNAPSHOTS = "snapshots"
+NAMESPACE_HEADER = "X-Todo-Namespace"
+NAMESPACE = os.environ.get("TODO_NAMESPACE")
+TOTAL_COUNT_HEADER = "X-Total-Count"
+STREAM_CHUNK_SIZE = 64 * 1024
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def set_base_url(url):
+    global BASEURL
+    BASEURL = url if url.endswith("/") else url + "/"
+
+
+def set_namespace(namespace):
+    # namespaces isolate the data of parallel workers on the stand-in server, other servers ignore the header
+    global NAMESPACE
+    NAMESPACE = namespace
+    RequestsHelpers.pool.set_header(NAMESPACE_HEADER, namespace)
+
+
+def namespace_headers():
+    return {NAMESPACE_HEADER: NAMESPACE} if NAMESPACE else {}
 
 
 class RequestsHelpers:
-    @staticmethod
-    def post_request(url, data, verify=True):
+    pool = ConnectionPool()
+    pool.headers.update(namespace_headers())
+    pool.add_response_hook(json_codec.response_hook)
+    latency_recorder = None
+    validators = ValidatorCache()
+
+    @classmethod
+    def enable_conditional_requests(cls, max_entries=256):
+        cls.validators = ValidatorCache(max_entries)
+        return cls.validators
+
+    @classmethod
+    def disable_conditional_requests(cls):
+        cls.validators = None
+
+    @classmethod
+    def configure_pool(cls, **settings):
+        cls.pool.configure(**settings)
+
+    @classmethod
+    def ensure_pool_size(cls, pool_maxsize):
+        # reconfiguring drops the session and its warm connections, so the pool is only ever grown
+        if pool_maxsize > cls.pool.settings["pool_maxsize"]:
+            cls.pool.configure(pool_maxsize=pool_maxsize)
+
+    @classmethod
+    def pool_statistics(cls):
+        return cls.pool.statistics()
+
+    @classmethod
+    def enable_timing(cls):
+        # opt-in, requests are not timed at all until a recorder hook is installed on the session
+        if cls.latency_recorder is None:
+            cls.latency_recorder = LatencyRecorder(BASEURL)
+            cls.pool.add_response_hook(cls.latency_recorder.response_hook)
+        return cls.latency_recorder
+
+    @classmethod
+    def disable_timing(cls):
+        recorder, cls.latency_recorder = cls.latency_recorder, None
+        if recorder is not None:
+            cls.pool.remove_response_hook(recorder.response_hook)
+        return recorder
+
+    @classmethod
+    def post_request(cls, url, data, verify=True):
         try:
-            rsp = requests.post(url, json=data)
+            rsp = cls.pool.session.post(url, data=None if data is None else json_codec.dumps(data),
+                                        headers=JSON_HEADERS if data is not None else None)
             if verify:
                 assert rsp.status_code == 200, "Unsuccessful post request, got response code {}".format(rsp.status_code)
             return rsp
@@ -23,29 +96,66 @@ class RequestsHelpers:
             print("Failed to retrieve: %s", url)
             raise
 
-    @staticmethod
-    def get_request(url, params=None):
+    @classmethod
+    def get_request(cls, url, params=None, verify=True, stream=False):
         try:
-            rsp = requests.get(url, params)
-            assert rsp.status_code == 200, "Unsuccessful get request, got response code {}".format(rsp.status_code)
+            validators = None if stream else cls.validators
+            if validators is None:
+                rsp = cls.pool.session.get(url, params=params, stream=stream)
+            else:
+                rsp = cls.conditional_get(validators, url, params)
+            if verify:
+                assert rsp.status_code == 200, "Unsuccessful get request, got response code {}".format(rsp.status_code)
             return rsp
         except Exception:
             raise
 
-    @staticmethod
-    def put_request(url, data, verify, auth=None, headers=None):
+    @classmethod
+    def conditional_get(cls, validators, url, params):
+        # streamed bodies are never kept, everything else that came with an etag is revalidated on the next read
+        key = (NAMESPACE, url, tuple(sorted(params.items())) if params else None)
+        cached = validators.get(key)
+        headers = {"If-None-Match": cached[0]} if cached is not None else None
+        rsp = cls.pool.session.get(url, params=params, headers=headers)
+        if rsp.status_code == 304 and cached is not None:
+            return validators.not_modified(cached[1])
+        etag = rsp.headers.get("ETag")
+        if rsp.status_code == 200 and etag:
+            validators.put(key, etag, rsp)
+        elif cached is not None:
+            validators.discard(key)
+        return rsp
+
+    @classmethod
+    def iter_pages(cls, url, parse, page_size):
+        # servers that ignore paging answer the first request with the whole collection, which is streamed as well
+        offset = 0
+        while True:
+            rsp = cls.get_request(url, params={"offset": offset, "limit": page_size}, stream=True)
+            count = 0
+            with rsp:
+                for item in parse(rsp.iter_content(chunk_size=STREAM_CHUNK_SIZE)):
+                    count += 1
+                    yield item
+            total = rsp.headers.get(TOTAL_COUNT_HEADER)
+            offset += count
+            if total is None or count == 0 or offset >= int(total):
+                return
+
+    @classmethod
+    def put_request(cls, url, data, verify, auth=None, headers=None):
         try:
-            rsp = requests.put(url, data, auth=auth, headers=headers)
+            rsp = cls.pool.session.put(url, data, auth=auth, headers=headers)
             if verify:
                 assert rsp.status_code == 200, "Unsuccessful put request, got response code {}".format(rsp.status_code)
             return rsp
         except Exception:
             raise
 
-    @staticmethod
-    def delete_request(url, verify, auth=None):
+    @classmethod
+    def delete_request(cls, url, verify, auth=None):
         try:
-            rsp = requests.delete(url, auth=auth)
+            rsp = cls.pool.session.delete(url, auth=auth)
             if verify:
                 assert rsp.status_code == 200, "Unsuccessful delete request, got response code {}".format(
                     rsp.status_code)
@@ -53,10 +163,10 @@ class RequestsHelpers:
         except Exception:
             raise
 
-    @staticmethod
-    def patch_request(url, data, verify, auth=None):
+    @classmethod
+    def patch_request(cls, url, data, verify, auth=None):
         try:
-            rsp = requests.patch(url, data, auth=auth)
+            rsp = cls.pool.session.patch(url, data, auth=auth)
             if verify:
                 assert rsp.status_code == 200, "Unsuccessful patch request, got response code {}".format(
                     rsp.status_code)
@@ -66,46 +176,113 @@ class RequestsHelpers:
 
 
 class AvailableAPIActions:
-    
-    @staticmethod
-    def get_list_of_tasks():
-        return RequestsHelpers.get_request(BASEURL)
+    token_cache = None
+    response_cache = None
 
-    @staticmethod
-    def get_list_of_tags():
-        return RequestsHelpers.get_request(urljoin(BASEURL, TAGS))
+    @classmethod
+    def enable_token_auth(cls, refresh_margin=30):
+        # mutating calls authenticate once per user and send the cached token instead of the credentials
+        cls.token_cache = TokenCache(
+            lambda username, password: cls.authenticate(cls.create_params_for_auth(username, password), verify=False),
+            refresh_margin)
+        return cls.token_cache
 
-    @staticmethod
-    def create_task(params, username, password, verify=True, needs_auth=True):
-        auth = HTTPBasicAuth(username, password) if needs_auth else None
-        rsp = RequestsHelpers.put_request(BASEURL, json.dumps(params), verify, auth)
-        return rsp
+    @classmethod
+    def disable_token_auth(cls):
+        cls.token_cache = None
 
-    @staticmethod
-    def create_task_with_token(params, headers, verify=True):
-        rsp = RequestsHelpers.put_request(BASEURL, json.dumps(params), verify=verify, headers=headers)
-        return rsp
+    @classmethod
+    def get_auth(cls, username, password, needs_auth=True):
+        if not needs_auth:
+            return None
+        token = cls.token_cache.get_token(username, password) if cls.token_cache is not None else None
+        # users that can't authenticate keep sending their credentials, so the server answers as without the cache
+        return HTTPBasicAuth(token, "") if token else HTTPBasicAuth(username, password)
 
-    @staticmethod
-    def get_task_description(task_id):
-        return RequestsHelpers.get_request(urljoin(BASEURL, str(task_id)))
+    @classmethod
+    def enable_response_cache(cls, ttl=5.0, max_entries=256):
+        # reads are answered from the cache until the ttl expires or a mutation goes through this class;
+        # changes made by other clients are only seen after the ttl
+        cls.response_cache = ResponseCache(ttl, max_entries)
+        return cls.response_cache
 
-    @staticmethod
-    def delete_task(task_id, username, password, verify=True, needs_auth=True):
-        auth = HTTPBasicAuth(username, password) if needs_auth else None
-        rsp = RequestsHelpers.delete_request(urljoin(BASEURL, str(task_id)), verify, auth)
+    @classmethod
+    def disable_response_cache(cls):
+        cls.response_cache = None
+
+    @classmethod
+    def cached_get(cls, url, verify=True):
+        cache = cls.response_cache
+        if cache is None:
+            return RequestsHelpers.get_request(url, verify=verify)
+        key = (NAMESPACE, url)
+        rsp = cache.get(key)
+        if rsp is None:
+            generation = cache.generation
+            rsp = RequestsHelpers.get_request(url, verify=verify)
+            if rsp.status_code == 200:
+                cache.put(key, rsp, generation)
         return rsp
 
+    @classmethod
+    def invalidate_cache(cls):
+        if cls.response_cache is not None:
+            cls.response_cache.invalidate()
+
+    @classmethod
+    def get_list_of_tasks(cls, verify=True):
+        return cls.cached_get(BASEURL, verify=verify)
+
+    @classmethod
+    def get_list_of_tags(cls, verify=True):
+        return cls.cached_get(urljoin(BASEURL, TAGS), verify=verify)
+
+    @classmethod
+    def create_task(cls, params, username, password, verify=True, needs_auth=True):
+        auth = cls.get_auth(username, password, needs_auth)
+        try:
+            return RequestsHelpers.put_request(BASEURL, json_codec.dumps(params), verify, auth)
+        finally:
+            cls.invalidate_cache()
+
     @staticmethod
-    def modify_task(task_id, data, username, password, verify=True, needs_auth=True):
-        auth = HTTPBasicAuth(username, password) if needs_auth else None
-        rsp = RequestsHelpers.patch_request(urljoin(BASEURL, str(task_id)), json.dumps(data), verify, auth)
-        return rsp
+    def iter_tasks(page_size=1000):
+        return RequestsHelpers.iter_pages(BASEURL, iter_json_array, page_size)
 
     @staticmethod
-    def get_information_about_tag(tag_id):
-        rsp = RequestsHelpers.get_request(urljoin(BASEURL, "{}/{}".format(TAGS, tag_id)))
-        return rsp
+    def iter_tags(page_size=1000):
+        return RequestsHelpers.iter_pages(urljoin(BASEURL, TAGS), iter_json_object, page_size)
+
+    @classmethod
+    def create_task_with_token(cls, params, headers, verify=True):
+        try:
+            return RequestsHelpers.put_request(BASEURL, json_codec.dumps(params), verify=verify, headers=headers)
+        finally:
+            cls.invalidate_cache()
+
+    @classmethod
+    def get_task_description(cls, task_id, verify=True):
+        return cls.cached_get(urljoin(BASEURL, str(task_id)), verify=verify)
+
+    @classmethod
+    def delete_task(cls, task_id, username, password, verify=True, needs_auth=True):
+        auth = cls.get_auth(username, password, needs_auth)
+        try:
+            return RequestsHelpers.delete_request(urljoin(BASEURL, str(task_id)), verify, auth)
+        finally:
+            cls.invalidate_cache()
+
+    @classmethod
+    def modify_task(cls, task_id, data, username, password, verify=True, needs_auth=True):
+        auth = cls.get_auth(username, password, needs_auth)
+        try:
+            return RequestsHelpers.patch_request(urljoin(BASEURL, str(task_id)), json_codec.dumps(data), verify, auth)
+        finally:
+            cls.invalidate_cache()
+
+    @classmethod
+    def get_information_about_tag(cls, tag_id, verify=True):
+        return cls.cached_get(urljoin(BASEURL, "{}/{}".format(TAGS, tag_id)), verify=verify)
 
     @staticmethod
     def create_new_user(data, verify=True):
@@ -116,9 +293,24 @@ class AvailableAPIActions:
     def authenticate(data, verify=True):
         return RequestsHelpers.post_request(urljoin(BASEURL, AUTH), data, verify)
 
-    @staticmethod
-    def reset_db():
+    @classmethod
+    def reset_db(cls):
         RequestsHelpers.get_request(urljoin(BASEURL, RESET))
+        cls.invalidate_cache()
+        if cls.token_cache is not None:
+            cls.token_cache.invalidate()
+
+    @staticmethod
+    def capture_snapshot(name, verify=True):
+        return RequestsHelpers.post_request(urljoin(BASEURL, "{}/{}".format(SNAPSHOTS, name)), None, verify)
+
+    @classmethod
+    def restore_snapshot(cls, name, verify=True):
+        rsp = RequestsHelpers.post_request(urljoin(BASEURL, "{}/{}/restore".format(SNAPSHOTS, name)), None, verify)
+        cls.invalidate_cache()
+        if cls.token_cache is not None:
+            cls.token_cache.invalidate()
+        return rsp
 
     @staticmethod
     def create_auth_headers(token):
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    def __init__(self, ttl=5.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (response, stored at), least recently used first
+        self.generation = 0  # bumped by every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, rsp, generation):
+        with self.lock:
+            # a read that was in flight while a mutation went through may already be stale
+            if generation != self.generation:
+                return
+            self.entries[key] = (rsp, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def statistics(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "evictions": self.evictions, "invalidations": self.invalidations, "entries": len(self.entries)}
+
+
+class ValidatorCache:
+    # last 200 response and its etag per url, revalidated with If-None-Match instead of being downloaded again
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (etag, response), least recently used first
+        self.revalidated = 0
+        self.downloaded = 0
+        self.bytes_saved = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, etag, rsp):
+        with self.lock:
+            self.downloaded += 1
+            self.entries[key] = (etag, rsp)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def not_modified(self, rsp):
+        with self.lock:
+            self.revalidated += 1
+            self.bytes_saved += len(rsp.content)
+        return rsp
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def statistics(self):
+        with self.lock:
+            return {"revalidated": self.revalidated, "downloaded": self.downloaded, "bytes_saved": self.bytes_saved,
+                    "entries": len(self.entries)}
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from framework.utils.requests_utils import AvailableAPIActions, RequestsHelpers
+
+
+TaskSpec = namedtuple("TaskSpec", ["title", "tags", "username", "password"])
+TaskSpec.__new__.__defaults__ = (None, "QA", "willWin")
+
+
+class SeedResult:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.created_ids = []
+        self.failures = []  # (spec, response status code or exception)
+        self.duration = 0.0
+
+    @property
+    def throughput(self):
+        return (len(self.created_ids) + len(self.failures)) / self.duration if self.duration else 0.0
+
+    def add(self, spec, outcome):
+        with self.lock:
+            if isinstance(outcome, Exception) or outcome.status_code != 200:
+                self.failures.append((spec, outcome if isinstance(outcome, Exception) else outcome.status_code))
+                return
+            try:
+                self.created_ids.append(outcome.json().get("id"))
+            except (ValueError, AttributeError) as e:
+                self.failures.append((spec, e))  # a 200 without the created task in its body
+
+
+def as_spec(spec):
+    if isinstance(spec, TaskSpec):
+        return spec
+    return TaskSpec(**spec) if isinstance(spec, dict) else TaskSpec(*spec)
+
+
+def create_task(spec):
+    params = AvailableAPIActions.create_params_for_task_creation(spec.title, spec.tags)
+    try:
+        return AvailableAPIActions.create_task(params, spec.username, spec.password, verify=False)
+    except Exception as e:
+        return e
+
+
+def seed_tasks(specs, max_workers=16, max_in_flight=None):
+    # specs are consumed lazily and at most max_in_flight are pending at once, so generators of any size can be seeded
+    max_in_flight = max_in_flight or 2 * max_workers
+    RequestsHelpers.ensure_pool_size(max_workers)
+    result = SeedResult()
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def on_done(spec, future):
+        # exceptions raised in done callbacks are swallowed, the slot must be given back whatever happens
+        try:
+            result.add(spec, future.result())
+        finally:
+            in_flight.release()
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="seeder") as executor:
+        for spec in specs:
+            spec = as_spec(spec)
+            in_flight.acquire()
+            future = executor.submit(create_task, spec)
+            future.add_done_callback(lambda f, spec=spec: on_done(spec, f))
+    result.duration = time.monotonic() - started
+    return result
@@ -0,0 +1,91 @@
+from framework.utils.data_checker import tag_names
+from framework.utils.requests_utils import AvailableAPIActions
+
+
+class TaskCollection:
+    # fetched tasks indexed by id, title, owner and tag name, kept up to date from the mutation responses
+    def __init__(self, tasks=()):
+        self.by_id = {}
+        self.by_title = {}
+        self.by_owner = {}
+        self.by_tag = {}
+        for task in tasks:
+            self.add(task)
+
+    @classmethod
+    def fetch(cls, page_size=1000):
+        return cls(AvailableAPIActions.iter_tasks(page_size))
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __contains__(self, task_id):
+        return self._key(task_id) in self.by_id
+
+    def get(self, task_id):
+        return self.by_id.get(self._key(task_id))
+
+    def find_by_title(self, title):
+        task_id = self.by_title.get(title)
+        return None if task_id is None else self.by_id[task_id]
+
+    def owned_by(self, username):
+        return [self.by_id[task_id] for task_id in self.by_owner.get(username, ())]
+
+    def with_tag(self, tag):
+        return [self.by_id[task_id] for task_id in self.by_tag.get(tag, ())]
+
+    def titles_with_tag(self, tag):
+        return [task.get("title") for task in self.with_tag(tag)]
+
+    def add(self, task):
+        task_id = self._key(task.get("id"))
+        if task_id in self.by_id:
+            self._unindex(self.by_id[task_id])
+        self.by_id[task_id] = task
+        self.by_title[task.get("title")] = task_id
+        self.by_owner.setdefault(task.get("username"), {})[task_id] = None
+        for tag in set(tag_names(task.get("tags") or [])):
+            self.by_tag.setdefault(tag, {})[task_id] = None
+        return task
+
+    def remove(self, task_id):
+        task = self.by_id.pop(self._key(task_id), None)
+        if task is not None:
+            self._unindex(task)
+        return task
+
+    def apply_response(self, rsp):
+        # create, modify and delete responses carry the whole task, anything else (e.g. a failed request) is ignored
+        if rsp.status_code != 200:
+            return None
+        task = rsp.json()
+        if not isinstance(task, dict) or "id" not in task:
+            return None
+        if rsp.request.method == "DELETE":
+            return self.remove(task["id"])
+        return self.add(task)
+
+    def _unindex(self, task):
+        task_id = self._key(task.get("id"))
+        if self.by_title.get(task.get("title")) == task_id:
+            del self.by_title[task.get("title")]
+        self._discard(self.by_owner, task.get("username"), task_id)
+        for tag in set(tag_names(task.get("tags") or [])):
+            self._discard(self.by_tag, tag, task_id)
+
+    @staticmethod
+    def _discard(index, key, task_id):
+        ids = index.get(key)
+        if ids is not None:
+            ids.pop(task_id, None)
+            if not ids:
+                del index[key]
+
+    @staticmethod
+    def _key(task_id):
+        # ids come back as numbers in json but are often taken from urls as strings
+        return str(task_id)
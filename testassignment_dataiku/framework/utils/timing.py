@@ -0,0 +1,157 @@
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+ROUTES = ("tags", "users", "authenticate", "reset", "snapshots")
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    # HDR-style log-linear buckets: every power of two range is split in sub_bucket_count buckets,
+    # which keeps the relative error under 10 ** -significant_figures whatever the magnitude
+    def __init__(self, significant_figures=2):
+        self.sub_bucket_bits = (2 * 10 ** significant_figures - 1).bit_length()
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    def record(self, seconds):
+        value = max(int(seconds * 1000000), 0)  # microseconds
+        shift = max(value.bit_length() - self.sub_bucket_bits, 0)
+        bucket = (value >> shift) << shift
+        with self.lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.total += 1
+            self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        with self.lock:
+            if not self.total:
+                return 0.0
+            threshold = max(self.total * percent / 100.0, 1)
+            seen = 0
+            for bucket in sorted(self.counts):
+                seen += self.counts[bucket]
+                if seen >= threshold:
+                    return min(bucket, self.max) / 1000000.0
+            return self.max / 1000000.0
+
+    def dump(self):
+        # plain lists and ints only, so the state can cross the pytest-xdist channel
+        with self.lock:
+            return {"counts": sorted(self.counts.items()), "total": self.total, "max": self.max}
+
+    def merge(self, state):
+        with self.lock:
+            for bucket, count in state["counts"]:
+                self.counts[bucket] = self.counts.get(bucket, 0) + count
+            self.total += state["total"]
+            self.max = max(self.max, state["max"])
+
+    def summary(self):
+        summary = {"count": self.total}
+        for percent in PERCENTILES:
+            summary["p{}".format(percent)] = self.percentile(percent)
+        summary["max"] = self.max / 1000000.0
+        return summary
+
+
+class LatencyRecorder:
+    def __init__(self, base_url):
+        self.base_path = urlsplit(base_url).path
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.transferred = {}  # endpoint -> [bytes on the wire, bytes after content decoding]
+
+    def endpoint(self, method, url):
+        path = urlsplit(url).path
+        if path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        segments = [segment for segment in path.strip("/").split("/") if segment]
+        template = []
+        for index, segment in enumerate(segments):
+            # ids are folded so that e.g. every PATCH /<id> lands in one histogram
+            if re.match(r"^\d+$", segment) or (index == 0 and segment not in ROUTES) or \
+                    (index == 1 and segments[0] in ("tags", "snapshots")):
+                segment = "<id>"
+            template.append(segment)
+        return "{} /{}".format(method.upper(), "/".join(template))
+
+    def record(self, method, url, seconds):
+        endpoint = self.endpoint(method, url)
+        histogram = self.histograms.get(endpoint)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(endpoint, LatencyHistogram())
+        histogram.record(seconds)
+
+    def record_bytes(self, method, url, wire, decoded):
+        endpoint = self.endpoint(method, url)
+        with self.lock:
+            transferred = self.transferred.setdefault(endpoint, [0, 0])
+            transferred[0] += wire
+            transferred[1] += decoded
+
+    def response_hook(self, rsp, *args, **kwargs):
+        # called by requests before the body is read, rsp.elapsed only covers the time to the headers;
+        # streamed bodies are left to the caller and only timed to the headers
+        started = time.perf_counter()
+        if not kwargs.get("stream"):
+            rsp.content
+        self.record(rsp.request.method, rsp.request.url,
+                    rsp.elapsed.total_seconds() + time.perf_counter() - started)
+        if not kwargs.get("stream"):
+            self.record_bytes(rsp.request.method, rsp.request.url, self.wire_size(rsp), len(rsp.content))
+        return rsp
+
+    @staticmethod
+    def wire_size(rsp):
+        # urllib3 counts the bytes read from the socket before decoding, other transports only tell the header
+        tell = getattr(rsp.raw, "tell", None)
+        if tell is not None:
+            return tell()
+        return int(rsp.headers.get("Content-Length") or len(rsp.content))
+
+    def dump(self):
+        with self.lock:
+            histograms = dict(self.histograms)
+            transferred = {endpoint: list(sizes) for endpoint, sizes in self.transferred.items()}
+        return {"histograms": {endpoint: histogram.dump() for endpoint, histogram in histograms.items()},
+                "transferred": transferred}
+
+    def merge(self, state):
+        # folds in the recordings of another process, e.g. a pytest-xdist worker
+        with self.lock:
+            for endpoint, histogram_state in state["histograms"].items():
+                self.histograms.setdefault(endpoint, LatencyHistogram()).merge(histogram_state)
+            for endpoint, (wire, decoded) in state["transferred"].items():
+                transferred = self.transferred.setdefault(endpoint, [0, 0])
+                transferred[0] += wire
+                transferred[1] += decoded
+
+    def summary(self):
+        with self.lock:
+            histograms = dict(self.histograms)
+            transferred = {endpoint: list(sizes) for endpoint, sizes in self.transferred.items()}
+        summary = {}
+        for endpoint in sorted(histograms):
+            summary[endpoint] = histograms[endpoint].summary()
+            summary[endpoint]["wire_bytes"], summary[endpoint]["decoded_bytes"] = transferred.get(endpoint, (0, 0))
+        return summary
+
+    def format_summary(self):
+        lines = ["{:<28} {:>7} {:>9} {:>9} {:>9} {:>9} {:>10} {:>10}".format(
+            "endpoint", "count", "p50 ms", "p95 ms", "p99 ms", "max ms", "wire KB", "decoded KB")]
+        for endpoint, stats in self.summary().items():
+            lines.append("{:<28} {:>7} {:>9.2f} {:>9.2f} {:>9.2f} {:>9.2f} {:>10.1f} {:>10.1f}".format(
+                endpoint, stats["count"], stats["p50"] * 1000, stats["p95"] * 1000, stats["p99"] * 1000,
+                stats["max"] * 1000, stats["wire_bytes"] / 1024.0, stats["decoded_bytes"] / 1024.0))
+        return "\n".join(lines)
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
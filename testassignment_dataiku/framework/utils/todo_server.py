@@ -0,0 +1,617 @@
+import argparse
+import base64
+import datetime
+import gzip
+import itertools
+import re
+import threading
+import uuid
+import zlib
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from framework.utils import json_codec
+
+
+DEFAULT_USERS = {"QA": "willWin"}
+TOKEN_EXPIRATION = 600  # seconds
+MAX_FIELD_LENGTH = 20
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+NAMESPACE_HEADER = "X-Todo-Namespace"
+SESSION_COOKIE = "todo_session"  # set on authentication like a browser session, accepted instead of basic auth
+COMPRESSION_THRESHOLD = 1024  # bytes, smaller bodies aren't worth the cpu and the encoding overhead
+COMPRESSION_LEVEL = 1  # json compresses well even at the fastest levels, higher ones mostly cost server cpu
+
+
+def compress(content, encoding):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(content)
+    if encoding == "gzip":
+        return gzip.compress(content, compresslevel=COMPRESSION_LEVEL)
+    return zlib.compress(content, COMPRESSION_LEVEL)
+
+
+def supported_encodings():
+    # in order of preference
+    return (("zstd",) if zstandard is not None else ()) + ("gzip", "deflate")
+
+
+def negotiate_encoding(accept_encoding):
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super(ApiError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+class CowTable:
+    # dict whose committed rows live in a shared base that snapshots keep a reference to; writes go to an overlay,
+    # so rolling back to a snapshot only has to drop the rows changed since, not copy the whole table
+    _deleted = object()
+
+    def __init__(self, base=None):
+        self.base = base if base is not None else {}
+        self.overlay = {}
+        self.tail = {}  # keys inserted since the base was frozen, in insertion order, iterated after the base ones
+        self.size = len(self.base)
+
+    def get(self, key, default=None):
+        if key in self.overlay:
+            value = self.overlay[key]
+            return default if value is self._deleted else value
+        return self.base.get(key, default)
+
+    def __contains__(self, key):
+        if key in self.overlay:
+            return self.overlay[key] is not self._deleted
+        return key in self.base
+
+    def __getitem__(self, key):
+        value = self.get(key, self._deleted)
+        if value is self._deleted:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        # like a dict, updating a row keeps its position and a row inserted again after a delete goes last
+        if key not in self:
+            self.size += 1
+            self.tail[key] = None
+        self.overlay[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.size -= 1
+        self.overlay[key] = self._deleted
+        self.tail.pop(key, None)
+
+    def __len__(self):
+        return self.size
+
+    def keys(self):
+        for key in self.base:
+            if key not in self.tail and self.overlay.get(key) is not self._deleted:
+                yield key
+        for key in self.tail:
+            yield key
+
+    def __iter__(self):
+        return self.keys()
+
+    def values(self):
+        return (self[key] for key in self.keys())
+
+    def items(self):
+        return ((key, self[key]) for key in self.keys())
+
+    def freeze(self):
+        # O(dataset) once at capture time, the frozen base is then shared by the snapshot and the live table
+        if self.overlay:
+            self.base = dict(self.items())
+            self.overlay = {}
+            self.tail = {}
+        return self.base
+
+    def restore(self, base):
+        self.base = base
+        self.overlay = {}
+        self.tail = {}
+        self.size = len(base)
+
+
+class TodoStore:
+    # in-memory implementation of the contract the api suites assert, not of the known defects of the deployed service
+    tables = ("users", "tokens", "tasks", "titles", "tags", "tag_ids", "counters")
+    empty_snapshot = {"users": DEFAULT_USERS, "tokens": {}, "tasks": {}, "titles": {}, "tags": {}, "tag_ids": {},
+                      "counters": {"task": 1, "tag": 1}}
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.snapshots = {}
+        # bumped by every change visible through the read endpoints, the epoch keeps etags of a restarted server apart
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        for table in self.tables:
+            setattr(self, table, CowTable())
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self._restore(self.empty_snapshot)
+
+    def capture_snapshot(self, name):
+        with self.lock:
+            self.snapshots[name] = {table: getattr(self, table).freeze() for table in self.tables}
+        return {"snapshot": name}
+
+    def restore_snapshot(self, name):
+        with self.lock:
+            if name not in self.snapshots:
+                raise ApiError(404, "Snapshot '{}' not found".format(name))
+            self._restore(self.snapshots[name])
+        return {"snapshot": name}
+
+    def delete_snapshot(self, name):
+        with self.lock:
+            if self.snapshots.pop(name, None) is None:
+                raise ApiError(404, "Snapshot '{}' not found".format(name))
+        return {"snapshot": name}
+
+    def list_snapshots(self):
+        with self.lock:
+            return sorted(self.snapshots)
+
+    def _restore(self, snapshot):
+        for table in self.tables:
+            getattr(self, table).restore(snapshot[table])
+        self.version += 1
+
+    @property
+    def etag(self):
+        return '"{}-{}"'.format(self.epoch, self.version)
+
+    @property
+    def next_task_id(self):
+        return self.counters["task"]
+
+    @property
+    def next_tag_id(self):
+        return self.counters["tag"]
+
+    def create_user(self, data):
+        username, password = self._parse_credentials(data)
+        with self.lock:
+            if username in self.users:
+                raise ApiError(400, "User '{}' already exists".format(username))
+            self.users[username] = password
+        return {"username": username}
+
+    def authenticate(self, data):
+        username, password = self._parse_credentials(data)
+        with self.lock:
+            if self.users.get(username) != password:
+                raise ApiError(401, "Invalid credentials")
+            token = uuid.uuid4().hex
+            self.tokens[token] = (username, self._now() + datetime.timedelta(seconds=TOKEN_EXPIRATION))
+        return {"token": token, "expires": TOKEN_EXPIRATION}
+
+    def check_auth(self, username, password):
+        with self.lock:
+            if username in self.users and self.users[username] == password:
+                return username
+            token_owner, expires_at = self.tokens.get(username, (None, None))
+            if token_owner is not None and not password and self._now() < expires_at:
+                return token_owner
+        raise ApiError(401, "Authentication required")
+
+    def list_tasks(self, offset=0, limit=None):
+        with self.lock:
+            tasks = itertools.islice(self.tasks.values(), offset, None if limit is None else offset + limit)
+            return [self._task_json(task) for task in tasks], len(self.tasks)
+
+    def get_task(self, task_id):
+        with self.lock:
+            return self._task_json(self._find_task(task_id))
+
+    def create_task(self, username, data):
+        title = self._validate_title(data.get("title"))
+        tag_names = self._validate_tags(data.get("tags", []))
+        with self.lock:
+            self._check_unique_title(title)
+            task = {"id": self.next_task_id, "title": title, "username": username, "date": self._now(),
+                    "done": False, "tags": [self._tag_id(name) for name in tag_names]}
+            self.tasks[task["id"]] = task
+            self.titles[title] = task["id"]
+            self.counters["task"] = task["id"] + 1
+            self.version += 1
+            return self._task_json(task)
+
+    def modify_task(self, username, task_id, data):
+        with self.lock:
+            task = dict(self._find_task(task_id))  # rows can be shared with snapshots, never change them in place
+            if task["username"] != username:
+                raise ApiError(403, "Only the owner can modify the task")
+            changes = {}
+            if "title" in data:
+                changes["title"] = self._validate_title(data["title"])
+                if changes["title"] != task["title"]:
+                    self._check_unique_title(changes["title"])
+            if "tags" in data:
+                changes["tags"] = [self._tag_id(name) for name in self._validate_tags(data["tags"])]
+            if "done" in data:
+                changes["done"] = bool(data["done"])
+            if "title" in changes:
+                del self.titles[task["title"]]
+                self.titles[changes["title"]] = task["id"]
+            task.update(changes)
+            self.tasks[task["id"]] = task
+            self.version += 1
+            return self._task_json(task)
+
+    def delete_task(self, username, task_id):
+        with self.lock:
+            task = self._find_task(task_id)
+            if task["username"] != username:
+                raise ApiError(403, "Only the owner can delete the task")
+            del self.tasks[task["id"]]
+            del self.titles[task["title"]]
+            self.version += 1
+            return self._task_json(task)
+
+    def list_tags(self, offset=0, limit=None):
+        with self.lock:
+            tags = itertools.islice(self.tags.items(), offset, None if limit is None else offset + limit)
+            return {name: self._tag_url(tag_id) for tag_id, name in tags}, len(self.tags)
+
+    def get_tag(self, tag_id):
+        with self.lock:
+            tag_id = self._parse_id(tag_id)
+            if tag_id not in self.tags:
+                raise ApiError(404, "Tag not found")
+            return {"tag": self.tags[tag_id],
+                    "tasks": [task["title"] for task in self.tasks.values() if tag_id in task["tags"]]}
+
+    def _find_task(self, task_id):
+        task = self.tasks.get(self._parse_id(task_id))
+        if task is None:
+            raise ApiError(404, "Task not found")
+        return task
+
+    def _check_unique_title(self, title):
+        if title in self.titles:
+            raise ApiError(400, "Task '{}' already exists".format(title))
+
+    def _tag_id(self, name):
+        tag_id = self.tag_ids.get(name)
+        if tag_id is None:
+            tag_id = self.tag_ids[name] = self.next_tag_id
+            self.tags[tag_id] = name
+            self.counters["tag"] = tag_id + 1
+        return tag_id
+
+    def _task_json(self, task):
+        return {"id": task["id"], "title": task["title"], "username": task["username"],
+                "date": task["date"].strftime(DATE_FORMAT), "done": task["done"],
+                "tags": [{"name": self.tags[tag_id], "url": self._tag_url(tag_id)} for tag_id in task["tags"]]}
+
+    @staticmethod
+    def _tag_url(tag_id):
+        return "/tags/{}".format(tag_id)
+
+    @staticmethod
+    def _parse_id(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ApiError(404, "Unknown id '{}'".format(value))
+
+    @staticmethod
+    def _parse_credentials(data):
+        username, password = data.get("username"), data.get("password")
+        if not isinstance(username, str) or not username or not isinstance(password, str) or not password:
+            raise ApiError(400, "Both username and password are required")
+        return username, password
+
+    @staticmethod
+    def _validate_title(title):
+        if not isinstance(title, str) or not title or len(title) > MAX_FIELD_LENGTH:
+            raise ApiError(400, "Title must contain from 1 to {} symbols".format(MAX_FIELD_LENGTH))
+        return title
+
+    @staticmethod
+    def _validate_tags(tags):
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            raise ApiError(400, "Tags must be a list of strings")
+        if any(len(tag) > MAX_FIELD_LENGTH for tag in tags):
+            raise ApiError(400, "Tags must not be longer than {} symbols".format(MAX_FIELD_LENGTH))
+        names = []
+        for tag in tags:
+            if tag and tag not in names:
+                names.append(tag)
+        return names
+
+    @staticmethod
+    def _now():
+        return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class TodoRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    conditional_handlers = ("list_tasks", "get_task", "list_tags", "get_tag")
+
+    routes = [
+        ("GET", re.compile(r"^/$"), "list_tasks"),
+        ("PUT", re.compile(r"^/$"), "create_task"),
+        ("GET", re.compile(r"^/tags/?$"), "list_tags"),
+        ("GET", re.compile(r"^/tags/(?P<tag_id>[^/]+)/?$"), "get_tag"),
+        ("POST", re.compile(r"^/users/?$"), "create_user"),
+        ("POST", re.compile(r"^/authenticate/?$"), "authenticate"),
+        ("GET", re.compile(r"^/reset/?$"), "reset"),
+        ("GET", re.compile(r"^/snapshots/?$"), "list_snapshots"),
+        ("POST", re.compile(r"^/snapshots/(?P<name>[^/]+)/?$"), "capture_snapshot"),
+        ("DELETE", re.compile(r"^/snapshots/(?P<name>[^/]+)/?$"), "delete_snapshot"),
+        ("POST", re.compile(r"^/snapshots/(?P<name>[^/]+)/restore/?$"), "restore_snapshot"),
+        ("GET", re.compile(r"^/(?P<task_id>[^/]+)/?$"), "get_task"),
+        ("PATCH", re.compile(r"^/(?P<task_id>[^/]+)/?$"), "modify_task"),
+        ("DELETE", re.compile(r"^/(?P<task_id>[^/]+)/?$"), "delete_task"),
+    ]
+
+    @property
+    def store(self):
+        return self.server.store_for(self.headers.get(NAMESPACE_HEADER, ""))
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PATCH(self):
+        self.dispatch("PATCH")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        self.query = parse_qs(url.query)
+        self.response_headers = {}
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        try:
+            path_matched = False
+            for route_method, pattern, handler in self.routes:
+                match = pattern.match(url.path)
+                if match is None:
+                    continue
+                if route_method == method:
+                    if handler in self.conditional_handlers and self.not_modified():
+                        return
+                    self.send_json(200, getattr(self, handler)(body, **match.groupdict()))
+                    return
+                path_matched = True
+            raise ApiError(405 if path_matched else 404, "No route for {} {}".format(method, url.path))
+        except ApiError as e:
+            self.response_headers = {}
+            self.send_json(e.status, {"error": e.message})
+
+    def not_modified(self):
+        # taken before the handler runs, a change racing with it can only make the etag older than the body
+        etag = self.store.etag
+        encoding = negotiate_encoding(self.headers.get("Accept-Encoding", ""))
+        if encoding is not None:
+            # every content encoding is another representation (Vary: Accept-Encoding), with its own strong etag
+            etag = '{}-{}"'.format(etag[:-1], encoding)
+        self.response_headers["ETag"] = etag
+        # "*" is not honoured: it would answer 304 before the handler could tell whether the resource exists
+        candidates = [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]
+        if etag not in candidates and "W/" + etag not in candidates:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        return True
+
+    def send_json(self, status, data):
+        content = json_codec.dumps(data)
+        encoding = None
+        if len(content) >= COMPRESSION_THRESHOLD:
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding", ""))
+            if encoding is not None:
+                content = compress(content, encoding)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in self.response_headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+    def authenticated_user(self):
+        header = self.headers.get("Authorization", "")
+        session = SimpleCookie(self.headers.get("Cookie", "")).get(SESSION_COOKIE)
+        if not header and session is not None:
+            return self.store.check_auth(session.value, "")
+        scheme, _, encoded = header.partition(" ")
+        try:
+            assert scheme.lower() == "basic"
+            username, _, password = base64.b64decode(encoded).decode("latin-1").partition(":")
+        except Exception:
+            raise ApiError(401, "Authentication required")
+        return self.store.check_auth(username, password)
+
+    @staticmethod
+    def parse_body(body):
+        try:
+            data = json_codec.loads(body) if body else {}
+        except ValueError:
+            raise ApiError(400, "Request body is not a valid json")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Request body must be a json object")
+        return data
+
+    def page(self):
+        # offset/limit paging is opt-in, the total count header tells clients the server honoured it
+        try:
+            offset = int(self.query.get("offset", ["0"])[0])
+            limit = int(self.query["limit"][0]) if "limit" in self.query else None
+        except ValueError:
+            raise ApiError(400, "offset and limit must be integers")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ApiError(400, "offset and limit must not be negative")
+        return offset, limit
+
+    def paged(self, list_items):
+        offset, limit = self.page()
+        items, total = list_items(offset, limit)
+        if limit is not None:
+            self.response_headers["X-Total-Count"] = str(total)
+        return items
+
+    def list_tasks(self, body):
+        return self.paged(self.store.list_tasks)
+
+    def create_task(self, body):
+        username = self.authenticated_user()
+        return self.store.create_task(username, self.parse_body(body))
+
+    def get_task(self, body, task_id):
+        return self.store.get_task(task_id)
+
+    def modify_task(self, body, task_id):
+        username = self.authenticated_user()
+        return self.store.modify_task(username, task_id, self.parse_body(body))
+
+    def delete_task(self, body, task_id):
+        username = self.authenticated_user()
+        return self.store.delete_task(username, task_id)
+
+    def list_tags(self, body):
+        return self.paged(self.store.list_tags)
+
+    def get_tag(self, body, tag_id):
+        return self.store.get_tag(tag_id)
+
+    def create_user(self, body):
+        return self.store.create_user(self.parse_body(body))
+
+    def authenticate(self, body):
+        token_info = self.store.authenticate(self.parse_body(body))
+        self.response_headers["Set-Cookie"] = "{}={}; Path=/; HttpOnly".format(SESSION_COOKIE, token_info["token"])
+        return token_info
+
+    def reset(self, body):
+        self.store.reset()
+        return {}
+
+    def list_snapshots(self, body):
+        return self.store.list_snapshots()
+
+    def capture_snapshot(self, body, name):
+        return self.store.capture_snapshot(name)
+
+    def restore_snapshot(self, body, name):
+        return self.store.restore_snapshot(name)
+
+    def delete_snapshot(self, body, name):
+        return self.store.delete_snapshot(name)
+
+
+class TodoHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address):
+        super(TodoHTTPServer, self).__init__(server_address, TodoRequestHandler)
+        self.stores_lock = threading.Lock()
+        self.stores = {}
+
+    def store_for(self, namespace):
+        # every namespace is an isolated db, so parallel workers sharing one server can't see each other's data
+        store = self.stores.get(namespace)
+        if store is None:
+            with self.stores_lock:
+                store = self.stores.setdefault(namespace, TodoStore())
+        return store
+
+
+class TodoServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.httpd = TodoHTTPServer((host, port))
+        self._thread = None
+
+    def store(self, namespace=""):
+        return self.httpd.store_for(namespace)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return "http://{}:{}/".format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="todo-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory stand-in for the todo service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    server = TodoServer(args.host, args.port)
+    print("Serving todo stand-in on {}".format(server.url))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import os
+import statistics
+
+from selenium import webdriver
+from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+
+from framework.forms import todopage
+from framework.utils import logging_helpers
+from framework.web_driver.selenium_driver import SeleniumChrome, SeleniumFirefox
+
+
+log = logging_helpers.set_log()
+
+HEADLESS = os.environ.get("TODO_HEADLESS", "1") != "0"  # TODO_HEADLESS=0 shows the browsers while debugging
+WINDOW_SIZE = (1024, 768)
+PAGE_LOAD_STRATEGY = "eager"  # hand the page over once the DOM is ready, without waiting for images and fonts
+# assets the todo page renders fine without, only chrome can block requests (through the devtools protocol)
+BLOCKED_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.woff", "*.woff2", "*.ttf", "*.eot",
+                "*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+
+
+def chrome_options(headless=HEADLESS):
+    options = webdriver.ChromeOptions()
+    options.headless = headless
+    for argument in ("--disable-gpu", "--disable-extensions", "--disable-dev-shm-usage",
+                     "--blink-settings=imagesEnabled=false", "--window-size={},{}".format(*WINDOW_SIZE)):
+        options.add_argument(argument)
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+
+def firefox_options(headless=HEADLESS):
+    options = webdriver.FirefoxOptions()
+    options.headless = headless
+    options.add_argument("--width={}".format(WINDOW_SIZE[0]))
+    options.add_argument("--height={}".format(WINDOW_SIZE[1]))
+    options.set_preference("permissions.default.image", 2)
+    options.set_preference("extensions.enabledScopes", 0)
+    options.set_preference("layers.acceleration.disabled", True)
+    return options
+
+
+def create_chrome(headless=HEADLESS, block_urls=True, **kwargs):
+    capabilities = DesiredCapabilities.CHROME.copy()
+    capabilities["pageLoadStrategy"] = PAGE_LOAD_STRATEGY
+    driver = SeleniumChrome(options=chrome_options(headless), desired_capabilities=capabilities, **kwargs)
+    if block_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+
+def create_firefox(headless=HEADLESS, **kwargs):
+    capabilities = DesiredCapabilities.FIREFOX.copy()
+    capabilities["pageLoadStrategy"] = PAGE_LOAD_STRATEGY
+    return SeleniumFirefox(options=firefox_options(headless), desired_capabilities=capabilities, **kwargs)
+
+
+FACTORIES = {"chrome": (SeleniumChrome, create_chrome), "firefox": (SeleniumFirefox, create_firefox)}
+
+
+def measure_page_loads(factory, url, loads):
+    driver = factory()
+    try:
+        timings = []
+        for _ in range(loads):
+            driver.get(url)
+            timings.append(driver.page_load_timing())
+    finally:
+        driver.quit()
+    summary = {}
+    for event in ("response", "dom_content_loaded", "load"):
+        values = [timing[event] for timing in timings if timing[event] is not None]
+        summary[event] = statistics.mean(values) if values else None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare page load times of default and tuned browsers")
+    parser.add_argument("--browser", choices=sorted(FACTORIES), default="chrome")
+    parser.add_argument("--url", default=todopage.web_url())
+    parser.add_argument("--loads", type=int, default=10)
+    args = parser.parse_args()
+
+    default, tuned = FACTORIES[args.browser]
+    for name, factory in (("default", default), ("tuned", tuned)):
+        summary = measure_page_loads(factory, args.url, args.loads)
+        log.info("{:<8} ".format(name) + "  ".join(
+            "{} {}".format(event, "{:.3f}s".format(value) if value is not None else "-")
+            for event, value in summary.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import queue
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+
+POOL_SIZE = int(os.environ.get("TODO_DRIVER_POOL_SIZE", "1"))
+ACQUIRE_TIMEOUT = 300  # seconds a test waits for a browser when all of them are busy
+
+
+class DriverPool:
+    # warm browsers handed out to tests one at a time, their state is wiped on release instead of quitting them
+    def __init__(self, factory, home_url, size=POOL_SIZE, max_uses=None):
+        assert size > 0, "Driver pool size must be positive"
+        self.factory = factory
+        self.home_url = home_url
+        self.size = size
+        self.max_uses = max_uses  # recycle a browser after that many tests, None keeps it for the whole run
+        self.lock = threading.Lock()
+        self.idle = queue.LifoQueue()  # the most recently used browser is the warmest one
+        self.uses = {}
+        self.created = 0
+        self.recycled = 0
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT):
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                driver = self._create() or self.idle.get(timeout=timeout)
+            if self.healthy(driver):
+                with self.lock:
+                    self.uses[driver] = self.uses.get(driver, 0) + 1
+                return driver
+            self.discard(driver)
+
+    def release(self, driver):
+        if self.max_uses is not None and self.uses.get(driver, 0) >= self.max_uses:
+            self.discard(driver)
+            return
+        try:
+            self.reset(driver)
+        except WebDriverException:
+            self.discard(driver)
+            return
+        self.idle.put(driver)
+
+    def reset(self, driver):
+        # storage can only be cleared on a page of the app's origin, the second load then starts logged out
+        driver.get(self.home_url)
+        driver.delete_all_cookies()
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.get(self.home_url)
+
+    @staticmethod
+    def healthy(driver):
+        try:
+            return driver.session_id is not None and driver.execute_script("return document.readyState") is not None
+        except WebDriverException:
+            return False
+
+    def discard(self, driver):
+        with self.lock:
+            self.uses.pop(driver, None)
+            self.created -= 1
+            self.recycled += 1
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def close(self):
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            self.discard(driver)
+
+    def _create(self):
+        with self.lock:
+            if self.created >= self.size:
+                return None
+            self.created += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self.lock:
+                self.created -= 1
+            raise
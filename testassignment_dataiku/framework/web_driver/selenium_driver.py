@@ -1,18 +1,127 @@
+import time
+
 from selenium import webdriver
 from selenium.webdriver.support import expected_conditions
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException, \
+    WebDriverException
 from selenium.webdriver.common.by import By
 
 TIMEOUT = 3
+# conditions are polled after 5, 10, 20... ms up to every 200ms, so a ready element isn't reported up to
+# half a second late as with WebDriverWait's fixed poll frequency, and long waits don't flood the driver
+POLL_START = 0.005
+POLL_MAX = 0.2
+# counts the xhr and fetch requests of the page, installed once per page load; returns the number started so far
+TRACK_REQUESTS_SCRIPT = """
+if (!window.__requests) {
+    var requests = window.__requests = {started: 0, finished: 0};
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        requests.started++;
+        this.addEventListener("loadend", function () { requests.finished++; });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            requests.started++;
+            var done = function () { requests.finished++; };
+            var promise = fetch.apply(this, arguments);
+            promise.then(done, done);
+            return promise;
+        };
+    }
+}
+return window.__requests.started;
+"""
+# true once a request was started after the given count and all of them finished, or the page was reloaded since
+REQUESTS_SETTLED_SCRIPT = """
+var requests = window.__requests;
+if (!requests) {
+    return document.readyState === "complete";
+}
+return requests.started > arguments[0] && requests.finished === requests.started;
+"""
 
 
 class SeleniumDriver:
+    navigation = 0  # bumped on every page load, elements found before one belong to a page that is gone
+
+    def __init__(self, *args, **kwargs):
+        self.waits = []  # (locator or condition, seconds, found) of every wait since reset_wait_statistics
+        super(SeleniumDriver, self).__init__(*args, **kwargs)
+
+    def get(self, url):
+        self.navigation += 1
+        super(SeleniumDriver, self).get(url)
+
+    def refresh(self):
+        self.navigation += 1
+        super(SeleniumDriver, self).refresh()
+
+    def back(self):
+        self.navigation += 1
+        super(SeleniumDriver, self).back()
+
+    def forward(self):
+        self.navigation += 1
+        super(SeleniumDriver, self).forward()
+
+    def wait_until(self, condition, timeout=TIMEOUT):
+        deadline = time.monotonic() + timeout
+        delay = POLL_START
+        while True:
+            try:
+                value = condition(self)
+                if value:
+                    return value
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException("Condition not met in {}s".format(timeout))
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, POLL_MAX)
+
     def get_element(self, condition, timeout=TIMEOUT):
+        condition = condition()
+        started = time.monotonic()
+        result = None
         try:
-            return WebDriverWait(self, timeout).until(condition())
+            result = self.wait_until(condition, timeout)
+            return result
         except (NoSuchElementException, WebDriverException, TimeoutException):
             return None
+        finally:
+            self.waits.append((getattr(condition, "locator", condition), time.monotonic() - started,
+                               result is not None))
+
+    def is_absent(self, locator):
+        # a single check, only meaningful once the page state is known (see wait_for_requests)
+        try:
+            return not any(element.is_displayed() for element in self.find_elements(*locator))
+        except StaleElementReferenceException:
+            return self.is_absent(locator)
+
+    def wait_until_absent(self, locator, timeout=TIMEOUT):
+        return self.get_element(lambda: lambda driver: driver.is_absent(locator), timeout) is not None
+
+    def track_requests(self):
+        return self.execute_script(TRACK_REQUESTS_SCRIPT)
+
+    def wait_for_requests(self, since, timeout=TIMEOUT):
+        # the page reacted to an action once the requests it started are answered, which tells when
+        # a check for an element that must not show up can be made, instead of waiting out a timeout
+        return self.get_element(lambda: lambda driver: driver.execute_script(REQUESTS_SETTLED_SCRIPT, since),
+                                timeout) is not None
+
+    def reset_wait_statistics(self):
+        self.waits = []
+
+    def wait_statistics(self):
+        durations = [seconds for _, seconds, _ in self.waits]
+        return {"calls": len(durations), "total": sum(durations), "max": max(durations, default=0.0),
+                "not_found": sum(1 for _, _, found in self.waits if not found)}
 
     def get_visible_element(self, locator, timeout=TIMEOUT):
         return self.get_element(lambda: expected_conditions.visibility_of_element_located(locator), timeout)
@@ -35,6 +144,23 @@ class SeleniumDriver:
     def get_visible_elems_by_xpath(self, xpath, timeout=TIMEOUT):
         return self.get_visible_elements((By.XPATH, xpath), timeout)
 
+    def get_script_result(self, script, accept=lambda result: result is not None, timeout=TIMEOUT):
+        # reruns the script until its result is accepted, the result is boxed so that e.g. an empty list can be one
+        def condition(driver):
+            result = driver.execute_script(script)
+            return (result,) if accept(result) else False
+
+        boxed = self.get_element(lambda: condition, timeout)
+        return boxed[0] if boxed else None
+
+    def page_load_timing(self):
+        # navigation timing of the current page in seconds since the navigation started, None for unreached events
+        timing = self.execute_script("var t = window.performance.timing; "
+                                     "return [t.navigationStart, t.responseEnd, t.domContentLoadedEventEnd, "
+                                     "t.loadEventEnd];")
+        return {event: (value - timing[0]) / 1000.0 if value else None
+                for event, value in zip(("response", "dom_content_loaded", "load"), timing[1:])}
+
 
 class SeleniumChrome(SeleniumDriver, webdriver.Chrome):
     pass
@@ -0,0 +1,37 @@
+import asyncio
+import unittest
+import uuid
+from framework.utils import requests_utils, async_requests_utils, data_checker, logging_helpers
+
+
+log = logging_helpers.set_log()
+
+
+class TestConcurrentRequests(unittest.TestCase):
+    def setUp(self):
+        self.username = "QA"
+        self.password = "willWin"
+        self.tasks_amount = 50
+        self.api_helpers = requests_utils.AvailableAPIActions
+        self.api_helpers.reset_db()
+
+    def test_create_tasks_concurrently(self):
+        test_tag = str(uuid.uuid4())[:20]
+        titles = ["test_title_{}".format(i) for i in range(self.tasks_amount)]
+
+        log.info("Step 1. Create {} tasks concurrently".format(self.tasks_amount))
+        asyncio.run(self.create_tasks(titles, [test_tag]))
+
+        log.info("Step 2. Obtain list of tasks - all of the tasks are present")
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        assert len(tasks) == self.tasks_amount, "Incorrect amount of tasks in db, expected {}, got {}".format(
+            self.tasks_amount, len(tasks))
+        assert sorted(task.get("title") for task in tasks) == sorted(titles), "Incorrect task titles saved to db"
+
+        for task in tasks:
+            data_checker.check_task_details(task, title=task.get("title"), tags=[test_tag], username=self.username)
+
+    async def create_tasks(self, titles, tags):
+        async with async_requests_utils.AsyncAPIActions(max_concurrency=10) as api:
+            await asyncio.gather(*[api.create_task(api.create_params_for_task_creation(title, tags),
+                                                   self.username, self.password) for title in titles])
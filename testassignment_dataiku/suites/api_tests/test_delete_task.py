@@ -1,6 +1,5 @@
 import unittest
-import uuid
-from framework.utils import requests_utils, logging_helpers
+from framework.utils import requests_utils, logging_helpers, db_fixtures, task_index
 
 
 log = logging_helpers.set_log()
@@ -11,40 +10,43 @@ class TestTaskDeletion(unittest.TestCase):
         self.username = "QA"
         self.password = "willWin"
         self.api_helpers = requests_utils.AvailableAPIActions
-        self.api_helpers.reset_db()
+        db_fixtures.DbSnapshots.restore("qa_user_with_tagged_task")
 
     def test_delete_existing_task(self):
-        test_tag = str(uuid.uuid4())[:20]
-        test_title = "test_title"
-
-        log.info("Step 1. Create a new task with valid fields")
-        params = self.api_helpers.create_params_for_task_creation(test_title, [test_tag])
-        self.api_helpers.create_task(params, self.username, self.password)
-
-        log.info("Step 2. Obtain task id to delete")
+        log.info("Step 1. Obtain task id to delete")
         tasks = self.api_helpers.get_list_of_tasks().json()
         assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
         task_id = tasks[0].get("id")
 
-        log.info("Step 3. Delete created task")
+        log.info("Step 2. Delete created task")
         self.api_helpers.delete_task(task_id, self.username, self.password)
         tasks = self.api_helpers.get_list_of_tasks().json()
         assert not tasks, "No tasks should be present in db"
 
-    def test_delete_existing_task_wo_authentication(self):
-        test_tag = str(uuid.uuid4())[:20]
-        test_title = "test_title"
+    def test_delete_existing_task_from_collection(self):
+        log.info("Step 1. Fetch the tasks into a collection")
+        tasks = task_index.TaskCollection.fetch()
+        assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
+        task_id = next(iter(tasks)).get("id")
+
+        log.info("Step 2. Delete the task and apply the response to the collection")
+        rsp = self.api_helpers.delete_task(task_id, self.username, self.password)
+        if not isinstance(rsp.json(), dict) or "id" not in rsp.json():
+            self.skipTest("The server doesn't return the deleted task")
+        tasks.apply_response(rsp)
 
-        log.info("Step 1. Create a new task with valid fields")
-        params = self.api_helpers.create_params_for_task_creation(test_title, [test_tag])
-        self.api_helpers.create_task(params, self.username, self.password)
+        log.info("Step 3. Check the task is removed from the collection and its indexes")
+        assert task_id not in tasks, "Deleted task is still in the collection"
+        assert not tasks.with_tag("test_tag"), "Deleted task is still indexed by its tag"
+        assert tasks.find_by_title("test_title") is None, "Deleted task is still indexed by its title"
 
-        log.info("Step 2. Obtain task id to delete")
+    def test_delete_existing_task_wo_authentication(self):
+        log.info("Step 1. Obtain task id to delete")
         tasks = self.api_helpers.get_list_of_tasks().json()
         assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
         task_id = tasks[0].get("id")
 
-        log.info("Step 4. Delete created task without authentication")
+        log.info("Step 2. Delete created task without authentication")
         rsp = self.api_helpers.delete_task(task_id, self.username, self.password, needs_auth=False, verify=False)
         assert rsp != 200, "Tasks can't be deleted without authentication"
         tasks = self.api_helpers.get_list_of_tasks().json()
@@ -53,43 +55,29 @@ class TestTaskDeletion(unittest.TestCase):
     def test_delete_existing_task_with_different_user(self):
         # test should fail, it expects an error if you delete a task with a wrong user
 
-        test_tag = str(uuid.uuid4())[:20]
-        test_title = "test_title_"
-
-        log.info("Step 1. Create a new task with valid fields, default user")
-        params = self.api_helpers.create_params_for_task_creation(test_title, [test_tag])
-        self.api_helpers.create_task(params, self.username, self.password)
-
-        log.info("Step 2. Obtain task id to delete")
+        log.info("Step 1. Obtain task id to delete")
         tasks = self.api_helpers.get_list_of_tasks().json()
         assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
         task_id = tasks[0].get("id")
 
-        log.info("Step 3. Create new user in db")
+        log.info("Step 2. Create new user in db")
         new_username = "new_user"
         new_pass = "wowmuchsecure"
         self.api_helpers.create_new_user({"username": new_username, "password": new_pass})
 
-        log.info("Step 4. Delete created task with a wrong user")
+        log.info("Step 3. Delete created task with a wrong user")
         rsp = self.api_helpers.delete_task(task_id, new_username, new_pass, needs_auth=True, verify=False)
         assert rsp != 200, "Tasks can't be deleted if user is not its owner"
         tasks = self.api_helpers.get_list_of_tasks().json()
         assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
 
     def test_delete_non_existent_task(self):
-        test_tag = str(uuid.uuid4())[:20]
-        test_title = "test_title"
-
-        log.info("Step 1. Create a new task with valid fields")
-        params = self.api_helpers.create_params_for_task_creation(test_title, [test_tag])
-        self.api_helpers.create_task(params, self.username, self.password)
-
-        log.info("Step 2. Obtain created task id")
+        log.info("Step 1. Obtain created task id")
         tasks = self.api_helpers.get_list_of_tasks().json()
         assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
         task_id = tasks[0].get("id")
 
-        log.info("Step 3. Delete a non existent task")
+        log.info("Step 2. Delete a non existent task")
         rsp = self.api_helpers.delete_task("new_".format(task_id), self.username, self.password, verify=False)
         assert rsp.status_code != 200, "Deleting non existent task should result in error"
         tasks = self.api_helpers.get_list_of_tasks().json()
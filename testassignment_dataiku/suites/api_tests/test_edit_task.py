@@ -1,6 +1,6 @@
 import unittest
 import uuid
-from framework.utils import requests_utils, data_checker, logging_helpers
+from framework.utils import requests_utils, data_checker, logging_helpers, db_fixtures
 
 
 log = logging_helpers.set_log()
@@ -130,3 +130,21 @@ class TestTaskEditing(unittest.TestCase):
         tasks = self.api_helpers.get_list_of_tasks().json()
         assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
         data_checker.check_task_details(tasks[0], title=new_title, tags=[new_tag], username=self.username, done=done)
+
+    def test_edit_task_keeps_its_position_in_list(self):
+        log.info("Step 1. Restore a db with 3 tasks")
+        db_fixtures.DbSnapshots.register("three_qa_tasks", lambda: [
+            self.api_helpers.create_task(self.api_helpers.create_params_for_task_creation("test_title_{}".format(i)),
+                                         self.username, self.password) for i in range(3)])
+        db_fixtures.DbSnapshots.restore("three_qa_tasks")
+        task_ids = [task.get("id") for task in self.api_helpers.get_list_of_tasks().json()]
+        assert len(task_ids) == 3, "Incorrect amount of tasks in db, expected {}, got {}".format(3, len(task_ids))
+
+        log.info("Step 2. Modify the first task")
+        params = self.api_helpers.create_params_for_task_modification(done=True)
+        self.api_helpers.modify_task(task_ids[0], params, self.username, self.password)
+
+        log.info("Step 3. Check the order of the tasks list is unchanged")
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        assert [task.get("id") for task in tasks] == task_ids, "Tasks order changed from {} to {}".format(
+            task_ids, [task.get("id") for task in tasks])
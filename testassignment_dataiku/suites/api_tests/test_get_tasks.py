@@ -1,6 +1,7 @@
 import unittest
 import uuid
-from framework.utils import requests_utils, data_checker, logging_helpers
+import requests
+from framework.utils import requests_utils, data_checker, logging_helpers, seeding, json_stream
 
 
 log = logging_helpers.set_log()
@@ -40,3 +41,191 @@ class TestTasksList(unittest.TestCase):
         assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
 
         data_checker.check_task_details(tasks[0], title=test_title, tags=[test_tag], username=self.username)
+
+    def test_list_of_many_tasks(self):
+        test_tag = str(uuid.uuid4())[:20]
+        titles = ["test_title_{}".format(i) for i in range(200)]
+
+        log.info("Step 1. Seed {} tasks".format(len(titles)))
+        result = seeding.seed_tasks(seeding.TaskSpec(title, [test_tag], self.username, self.password) for title in titles)
+        assert not result.failures, "Couldn't create tasks: {}".format(result.failures)
+
+        log.info("Step 2. Obtain list of tasks - all of the seeded tasks are present")
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        assert len(tasks) == len(titles), "Incorrect amount of tasks in db, expected {}, got {}".format(len(titles), len(tasks))
+        assert sorted(task.get("id") for task in tasks) == sorted(result.created_ids), "Incorrect task ids in db"
+
+        expected = {title: {"tags": [test_tag], "username": self.username} for title in titles}
+        report = data_checker.check_tasks_batch(tasks, expected=expected, max_age=data_checker.MAX_TASK_AGE)
+        assert report.ok, str(report)
+
+    def test_batch_check_of_done_flags(self):
+        titles = ["test_title_{}".format(i) for i in range(3)]
+
+        log.info("Step 1. Seed {} tasks and mark the first one as done".format(len(titles)))
+        result = seeding.seed_tasks(seeding.TaskSpec(title, None, self.username, self.password) for title in titles)
+        assert not result.failures, "Couldn't create tasks: {}".format(result.failures)
+        done_id = self.api_helpers.get_list_of_tasks().json()[0].get("id")
+        self.api_helpers.modify_task(done_id, self.api_helpers.create_params_for_task_modification(done=True),
+                                     self.username, self.password)
+
+        log.info("Step 2. Check the list of tasks - the done flags are the expected booleans")
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        expected = {task.get("title"): {"done": task.get("id") == done_id} for task in tasks}
+        report = data_checker.check_tasks_batch(tasks, expected=expected)
+        assert report.ok, str(report)
+
+        log.info("Step 3. Check a dump with non boolean done flags - they are reported, not coerced with bool()")
+        tasks[1]["done"], tasks[2]["done"] = "true", None
+        report = data_checker.check_tasks_batch(tasks, expected=expected)
+        invalid = sorted(report.violations.get("invalid_done", []))
+        assert invalid == sorted([tasks[1].get("id"), tasks[2].get("id")]), \
+            "Incorrect tasks reported with invalid done flags: {}".format(invalid)
+
+    def test_iterate_over_list_of_tasks(self):
+        titles = ["test_title_{}".format(i) for i in range(120)]
+
+        log.info("Step 1. Seed {} tasks".format(len(titles)))
+        result = seeding.seed_tasks(seeding.TaskSpec(title, None, self.username, self.password) for title in titles)
+        assert not result.failures, "Couldn't create tasks: {}".format(result.failures)
+
+        log.info("Step 2. Iterate over the tasks page by page - the same tasks as in the full list are yielded")
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        iterated_tasks = list(self.api_helpers.iter_tasks(page_size=50))
+        assert iterated_tasks == tasks, "Iterating over tasks yields {} tasks, the full list has {}".format(
+            len(iterated_tasks), len(tasks))
+
+    def test_stream_list_split_at_any_byte(self):
+        titles = ["test_title_{}".format(i) for i in range(3)]
+
+        log.info("Step 1. Seed {} tasks".format(len(titles)))
+        result = seeding.seed_tasks(seeding.TaskSpec(title, ["test_tag"], self.username, self.password)
+                                    for title in titles)
+        assert not result.failures, "Couldn't create tasks: {}".format(result.failures)
+
+        log.info("Step 2. Parse the list of tasks from 1 byte chunks - the same tasks as in the full list are yielded")
+        rsp = self.api_helpers.get_list_of_tasks()
+        chunks = [rsp.content[i:i + 1] for i in range(len(rsp.content))]
+        assert list(json_stream.iter_json_array(chunks)) == rsp.json(), "Incorrect tasks parsed from 1 byte chunks"
+
+        log.info("Step 3. Parse numbers cut right after '.', 'e' or '-' - they are read whole")
+        body = b'[1.5, -2500.0, 3e-2, 4E+1, -7, 0]'
+        for size in (1, 2, 3):
+            chunks = [body[i:i + size] for i in range(0, len(body), size)]
+            values = list(json_stream.iter_json_array(chunks))
+            assert values == [1.5, -2500.0, 0.03, 40.0, -7, 0], \
+                "Incorrect numbers parsed from {} byte chunks: {}".format(size, values)
+
+    def test_list_of_tasks_with_response_cache(self):
+        test_tag = str(uuid.uuid4())[:20]
+        previous_cache = self.api_helpers.response_cache  # e.g. the session wide one of --response-cache
+        self.addCleanup(setattr, self.api_helpers, "response_cache", previous_cache)
+        cache = self.api_helpers.enable_response_cache(ttl=60)
+
+        log.info("Step 1. Obtain list of tasks twice - the second read is answered from the cache")
+        self.api_helpers.get_list_of_tasks()
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        assert len(tasks) == 0, "Incorrect amount of tasks in db, expected {}, got {}".format(0, len(tasks))
+        assert cache.hits == 1, "Expected {} cache hit, got {}".format(1, cache.hits)
+
+        log.info("Step 2. Create a new task - the cached list is dropped")
+        params = self.api_helpers.create_params_for_task_creation("test_title", [test_tag])
+        task_id = self.api_helpers.create_task(params, self.username, self.password).json().get("id")
+
+        log.info("Step 3. Obtain list of tasks - the new task is present")
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
+
+        log.info("Step 4. Mark the task as done - its cached details are dropped")
+        self.api_helpers.get_task_description(task_id)
+        params = self.api_helpers.create_params_for_task_modification(done=True)
+        self.api_helpers.modify_task(task_id, params, self.username, self.password)
+        task = self.api_helpers.get_task_description(task_id).json()
+        data_checker.check_task_details(task, title="test_title", tags=[test_tag], username=self.username, done=True)
+
+    def test_polling_list_of_tasks_with_etag(self):
+        validators = requests_utils.RequestsHelpers.enable_conditional_requests()
+        self.addCleanup(requests_utils.RequestsHelpers.enable_conditional_requests)
+        # reads answered by the opt-in response cache never reach the server to be revalidated
+        self.addCleanup(setattr, self.api_helpers, "response_cache", self.api_helpers.response_cache)
+        self.api_helpers.disable_response_cache()
+        params = self.api_helpers.create_params_for_task_creation("test_title")
+        self.api_helpers.create_task(params, self.username, self.password)
+
+        log.info("Step 1. Obtain list of tasks - the response carries an etag")
+        rsp = self.api_helpers.get_list_of_tasks()
+        if "ETag" not in rsp.headers:
+            self.skipTest("The server doesn't send etags")
+
+        log.info("Step 2. Obtain list of tasks again - the unchanged list is revalidated, not downloaded")
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        assert tasks == rsp.json(), "Revalidated list differs from the downloaded one"
+        assert validators.revalidated == 1, "Expected {} revalidated request, got {}".format(1, validators.revalidated)
+
+        log.info("Step 3. Create a new task and obtain list of tasks - the changed list is downloaded")
+        params = self.api_helpers.create_params_for_task_creation("test_title_2")
+        self.api_helpers.create_task(params, self.username, self.password)
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        assert len(tasks) == 2, "Incorrect amount of tasks in db, expected {}, got {}".format(2, len(tasks))
+        assert validators.revalidated == 1, "Changed list was not downloaded again"
+
+    def test_etag_of_each_content_encoding(self):
+        url = requests_utils.BASEURL
+        session = requests_utils.RequestsHelpers.pool.session
+        params = self.api_helpers.create_params_for_task_creation("test_title")
+        self.api_helpers.create_task(params, self.username, self.password)
+
+        log.info("Step 1. Obtain list of tasks as gzip and as identity - each encoding has its own etag")
+        gzip_rsp = session.get(url, headers={"Accept-Encoding": "gzip"})
+        identity_rsp = session.get(url, headers={"Accept-Encoding": "identity"})
+        if "ETag" not in gzip_rsp.headers:
+            self.skipTest("The server doesn't send etags")
+        assert gzip_rsp.headers["ETag"] != identity_rsp.headers["ETag"], \
+            "Gzip and identity responses share the etag {}".format(gzip_rsp.headers["ETag"])
+
+        log.info("Step 2. Revalidate the identity list with the gzip etag - the list is downloaded")
+        rsp = session.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": gzip_rsp.headers["ETag"]})
+        assert rsp.status_code == 200, "Expected response code {}, got {}".format(200, rsp.status_code)
+
+        log.info("Step 3. Revalidate the gzip list with its own etag - it is not modified")
+        rsp = session.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_rsp.headers["ETag"]})
+        assert rsp.status_code == 304, "Expected response code {}, got {}".format(304, rsp.status_code)
+
+    def test_invalid_json_body_raises_requests_error(self):
+        url = requests_utils.BASEURL
+        session = requests_utils.RequestsHelpers.pool.session
+
+        log.info("Step 1. Obtain list of tasks and revalidate it - the 304 response has no body")
+        etag = session.get(url).headers.get("ETag")
+        if etag is None:
+            self.skipTest("The server doesn't send etags")
+        rsp = session.get(url, headers={"If-None-Match": etag})
+        assert rsp.status_code == 304, "Expected response code {}, got {}".format(304, rsp.status_code)
+
+        log.info("Step 2. Decode the empty body - requests' JSONDecodeError is raised whatever the json codec")
+        with self.assertRaises(requests.exceptions.JSONDecodeError):
+            rsp.json()
+
+    def test_compressed_list_of_many_tasks(self):
+        helpers = requests_utils.RequestsHelpers
+        titles = ["test_title_{}".format(i) for i in range(200)]
+        self.addCleanup(helpers.configure_pool, compression=True)
+        helpers.disable_conditional_requests()  # the second read must be downloaded, not revalidated
+        self.addCleanup(helpers.enable_conditional_requests)
+
+        log.info("Step 1. Seed {} tasks".format(len(titles)))
+        result = seeding.seed_tasks(seeding.TaskSpec(title, None, self.username, self.password) for title in titles)
+        assert not result.failures, "Couldn't create tasks: {}".format(result.failures)
+
+        log.info("Step 2. Obtain list of tasks without compression")
+        helpers.configure_pool(compression=False)
+        plain = helpers.get_request(requests_utils.BASEURL)
+        assert "Content-Encoding" not in plain.headers, "Response is encoded although the client refused it"
+
+        log.info("Step 3. Obtain list of tasks with compression - it decodes to the same list")
+        helpers.configure_pool(compression=True)
+        compressed = helpers.get_request(requests_utils.BASEURL)
+        if "Content-Encoding" not in compressed.headers:
+            self.skipTest("The server doesn't compress responses")
+        assert compressed.json() == plain.json(), "Compressed list differs from the plain one"
+        assert compressed.raw.tell() < len(plain.content), "Compressed list is not smaller on the wire"
@@ -1,6 +1,6 @@
 import unittest
 import uuid
-from framework.utils import requests_utils, data_checker, logging_helpers
+from framework.utils import requests_utils, data_checker, logging_helpers, task_index
 
 
 log = logging_helpers.set_log()
@@ -50,4 +50,9 @@ class TestTagDetails(unittest.TestCase):
         tag2_details = self.api_helpers.get_information_about_tag(tag2_id).json()
         data_checker.check_tag_details(tag2_details, second_tag, [first_title, second_title])
 
+        log.info("Step 7. Check tag details match the tags of the tasks in the list of tasks")
+        tasks = task_index.TaskCollection.fetch()
+        data_checker.check_tag_details(tag1_details, first_tag, tasks.titles_with_tag(first_tag))
+        data_checker.check_tag_details(tag2_details, second_tag, tasks.titles_with_tag(second_tag))
+
 
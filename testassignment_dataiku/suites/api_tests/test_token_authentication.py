@@ -1,10 +1,9 @@
 import unittest
-import base64
 import uuid
 import datetime
 import time
 
-from framework.utils import requests_utils, logging_helpers, data_checker
+from framework.utils import requests_utils, logging_helpers, data_checker, credentials
 
 
 log = logging_helpers.set_log()
@@ -38,9 +37,7 @@ class TestTokenAuth(unittest.TestCase):
     def test_adding_task_with_auth_incorrect_token(self):
         log.info("Step 1. Get authentication token")
         token_info, _ = self.get_token(self.username, self.password)
-        token = token_info.get("token") + "extra"
-        token = "{}:".format(token)  # username:password
-        encoded_token = base64.b64encode(token.encode()).decode()
+        encoded_token = credentials.encode_token(token_info.get("token") + "extra")
 
         log.info("Step 2. Create a new task using a different token for authorization")
         headers = self.api_helpers.create_auth_headers(encoded_token)
@@ -88,6 +85,21 @@ class TestTokenAuth(unittest.TestCase):
         tasks = self.api_helpers.get_list_of_tasks().json()
         assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
 
+    def test_no_auth_after_authenticated_calls(self):
+        log.info("Step 1. Authenticate and create a task")
+        self.get_token(self.username, self.password)
+        params = self.api_helpers.create_params_for_task_creation(self.title, [self.valid_tag])
+        task_id = self.api_helpers.create_task(params, self.username, self.password).json().get("id")
+
+        log.info("Step 2. Delete the task without authentication - the session cookies are not sent")
+        rsp = self.api_helpers.delete_task(task_id, self.username, self.password, verify=False, needs_auth=False)
+        assert rsp.status_code == 401, "Tasks should not be deleted without authentication, got {}".format(
+            rsp.status_code)
+
+        log.info("Step 3. Obtain list of tasks - there is 1 task present")
+        tasks = self.api_helpers.get_list_of_tasks().json()
+        assert len(tasks) == 1, "Incorrect amount of tasks in db, expected {}, got {}".format(1, len(tasks))
+
     def get_token(self, username, password):
         token_info = self.api_helpers.authenticate(
             self.api_helpers.create_params_for_auth(username, password)).json()
@@ -95,9 +107,7 @@ class TestTokenAuth(unittest.TestCase):
         expiration = token_info.get("expires")
         assert token, "Couldn't obtain token from json response"
         assert expiration, "Couldn't obtain expiration period from json response"
-        token = "{}:".format(token)  # username:password
-        encoded_token = base64.b64encode(token.encode()).decode()
-        return token_info, encoded_token
+        return token_info, credentials.encode_token(token)
 
 
 
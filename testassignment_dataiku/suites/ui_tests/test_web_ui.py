@@ -1,11 +1,21 @@
 import unittest
 
-from framework.web_driver import selenium_driver
-from framework.utils import requests_utils, data_checker, logging_helpers
-from framework.forms import todopage
+from framework.web_driver import driver_factory, driver_pool
+from framework.utils import requests_utils, data_checker, logging_helpers, seeding, db_fixtures
+from framework.forms import todopage, api_login
 
 
 log = logging_helpers.set_log()
+# fix the path!
+# drivers = driver_pool.DriverPool(lambda: driver_factory.create_chrome(executable_path='../../chromedriver'),
+#                                  todopage.web_url())
+drivers = driver_pool.DriverPool(driver_factory.create_chrome, todopage.web_url())
+# set when running in parallel (pytest -n N suites/ui_tests), every worker then has its own browser and user
+worker_user = db_fixtures.WorkerUser.for_worker()
+
+
+def tearDownModule():
+    drivers.close()
 
 
 class TestTaskDetails(unittest.TestCase):
@@ -16,17 +26,36 @@ class TestTaskDetails(unittest.TestCase):
         self.tags = ["tag1", "tag2", "moretags"]
         
         self.api_helpers = requests_utils.AvailableAPIActions
-        self.api_helpers.reset_db()
-        # fix the path!
-        # self.driver = selenium_driver.SeleniumChrome(executable_path='../../chromedriver')
-        self.driver = selenium_driver.SeleniumChrome()
+        if worker_user is None:
+            self.api_helpers.reset_db()
+        else:
+            # other workers' tasks are on the same server, titles must stay unique and resetting it is off limits
+            self.username, self.password = worker_user.provision()
+            self.title = "Test title {}".format(worker_user.worker_id)
+            worker_user.clear_tasks()
+        self.driver = drivers.acquire()
+        self.addCleanup(drivers.release, self.driver)  # runs after tearDown, even when the logout fails
+        self.driver.reset_wait_statistics()
+        self.addCleanup(self.log_wait_statistics)
         self.webpage = todopage.TodoPage(self.driver)
+        if worker_user is not None:
+            self.webpage.scope_to_user(self.username)
         self.needs_logout = True
 
     def tearDown(self) -> None:
         if self.needs_logout:
             self.webpage.logout()
-        self.driver.quit()
+
+    def log_wait_statistics(self):
+        log.info("Waited {total:.2f}s for elements in {calls} lookups, {not_found} not found".format(
+            **self.driver.wait_statistics()))
+
+    def login_and_seed_task(self):
+        log.info("Step 1. Login with default credentials")
+        api_login.ApiLogin.login(self.webpage, self.username, self.password)
+
+        log.info("Step 2. Add a new task through the api")
+        api_login.ApiLogin.seed(self.webpage, [seeding.TaskSpec(self.title, self.tags, self.username, self.password)])
 
     def test_add_task(self):
         log.info("Step 1. Login with default credentials")
@@ -41,16 +70,11 @@ class TestTaskDetails(unittest.TestCase):
 
     def test_edit_task(self):
         # test should fail, because tags are reset after page refresh
-
-        log.info("Step 1. Login with default credentials")
-        self.webpage.login(self.username, self.password)
-
-        log.info("Step 2. Add a new task")
-        self.webpage.add_task(self.title, " ".join(self.tags))
+        self.login_and_seed_task()
 
         log.info("Step 3. Edit tags and success status of the created task")
         self.tags = ["tag0"]
-        self.webpage.edit_task(tags=self.tags, done=True)
+        self.webpage.edit_task(tags=self.tags, done=True, fast_fill=True)
 
         log.info("Step 4. Check task data is present on the web page")
         self.driver.refresh()
@@ -58,26 +82,19 @@ class TestTaskDetails(unittest.TestCase):
         data_checker.check_task_details(task_data_from_ui, self.title, self.tags, self.username, True)
 
     def test_delete_task(self):
-        log.info("Step 1. Login with default credentials")
-        self.webpage.login(self.username, self.password)
-
-        log.info("Step 2. Add a new task")
-        self.webpage.add_task(self.title, " ".join(self.tags))
+        self.login_and_seed_task()
 
         log.info("Step 3. Delete just created task")
         self.webpage.delete_task()
         self.driver.refresh()
 
         log.info("Step 4. Check task data is removed from the web page")
-        tasks = self.webpage.tasks_table_rows
-        assert len(tasks) == 1, "Expected no tasks, got {}".format(len(tasks) - 1)
+        tasks = self.webpage.tasks_table
+        assert tasks is not None, "Tasks table is not shown"
+        assert len(tasks) == 0, "Expected no tasks, got {}".format(len(tasks))
 
     def test_mark_task_as_done(self):
-        log.info("Step 1. Login with default credentials")
-        self.webpage.login(self.username, self.password)
-
-        log.info("Step 2. Add a new task")
-        self.webpage.add_task(self.title, " ".join(self.tags))
+        self.login_and_seed_task()
 
         log.info("Step 3. Mark created task as done from main page")
         self.webpage.mark_done()
@@ -96,6 +113,11 @@ class TestTaskDetails(unittest.TestCase):
     def test_backend_data_shows_on_webpage(self):
         new_username = "new_user"
         new_password = "new_pass"
+        if worker_user is not None:
+            new_user = db_fixtures.WorkerUser(worker_user.worker_id)
+            new_username, new_password = new_user.username, new_user.password
+            self.addCleanup(new_user.clear_tasks)
+            self.webpage.scope_to_user(new_username)
 
         log.info("Step 1. Create new user")
         self.api_helpers.create_new_user({"username": new_username, "password": new_password})
@@ -117,5 +139,5 @@ class TestTaskDetails(unittest.TestCase):
         log.info("Step 1. Login with incorrect credentials")
         self.webpage.login(self.username, "gibberish")
 
-        assert self.webpage.sign_out_button is None
+        assert self.webpage.is_logged_out(), "Logged in with an incorrect password"
         self.needs_logout = False